@@ -0,0 +1,181 @@
+"""
+Apply a filter exported by the application to many signal records at once.
+
+    python Filter/batch_filter.py design.csv Resources/signals -o filtered/ -f npy
+    python Filter/batch_filter.py design.csv "records/*.hea" -o out/ --correct-phase
+
+Every .csv, .hea or .npy record is filtered on a process pool spread across
+all the cores, and written as <record>_filtered.<format> (and
+<record>_corrected.<format> when the phase is corrected with the all-pass
+filters of the design), in CSV unless another format is chosen. Records in
+subdirectories are written to the same subdirectories of the output, and
+records sharing a name keep their extension in it (<record>_csv_filtered).
+"""
+
+import argparse
+import glob
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from core import load_design, open_signal, write_signal
+
+RECORD_EXTENSIONS = (".csv", ".hea", ".npy")  # a .dat is read through its .hea
+OUTPUT_FORMATS = ("csv", "npy", "f32", "f64", "hea")
+
+# The design each worker process applies, set once per process
+worker_design = None
+
+
+def find_records(inputs, exclude=()):
+    # The filter file itself may sit among the records, it is left out
+    seen = {os.path.abspath(path) for path in exclude}
+    records = []
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            pattern = os.path.join(pattern, "*")
+        for path in sorted(glob.glob(pattern)):
+            if path.endswith(RECORD_EXTENSIONS) and os.path.abspath(path) not in seen:
+                seen.add(os.path.abspath(path))
+                records.append(path)
+    return records
+
+
+def output_names(records):
+    """
+    A unique output name per record: its path relative to the directory all
+    the records are in, without the extension. Records that would share a
+    name, like rec.csv and rec.hea, keep their extension in it.
+    """
+    paths = [os.path.abspath(record) for record in records]
+    root = os.path.commonpath([os.path.dirname(path) for path in paths])
+    stems = [os.path.splitext(os.path.relpath(path, root))[0] for path in paths]
+    counts = Counter(os.path.normcase(stem) for stem in stems)
+    return [
+        (
+            stem
+            if counts[os.path.normcase(stem)] == 1
+            else f"{stem}_{os.path.splitext(path)[1][1:]}"
+        )
+        for stem, path in zip(stems, paths)
+    ]
+
+
+def record_outputs(output_name, output_directory, correct_phase, output_format):
+    suffixes = ["filtered", "corrected"] if correct_phase else ["filtered"]
+    return [
+        os.path.join(output_directory, f"{output_name}_{suffix}.{output_format}")
+        for suffix in suffixes
+    ]
+
+
+def init_worker(design):
+    global worker_design
+    worker_design = design
+
+
+def filter_record(record_path, outputs):
+    # Records from subdirectories are written to the same subdirectories
+    os.makedirs(os.path.dirname(outputs[0]), exist_ok=True)
+    signal = open_signal(record_path)
+    filtered_data = worker_design.filter(signal)
+    write_signal(outputs[0], filtered_data, source=signal)
+
+    if len(outputs) > 1:
+        write_signal(
+            outputs[1], worker_design.correct_phase(filtered_data), source=signal
+        )
+    return outputs
+
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Filter signal records with a filter exported by FilterMaster."
+    )
+    parser.add_argument("filter_file", help="filter CSV exported by the application")
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="directories or glob patterns of .csv/.hea/.npy signal records",
+    )
+    parser.add_argument(
+        "-o", "--output", required=True, help="directory for the filtered records"
+    )
+    parser.add_argument(
+        "--correct-phase",
+        action="store_true",
+        help="also write the signals corrected by the design's all-pass filters",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="csv",
+        help="format of the written signals (default: csv)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count(),
+        help="number of worker processes (default: all cores)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    arguments = parse_arguments(argv)
+    try:
+        design = load_design(arguments.filter_file)
+    except (OSError, ValueError) as e:
+        print(f"Error loading the filter file: {e}", file=sys.stderr)
+        return 2
+    if arguments.correct_phase and len(design.all_pass) == 0:
+        print("The filter file has no all-pass filters to correct the phase with")
+        return 2
+
+    records = find_records(arguments.inputs, exclude=[arguments.filter_file])
+    if not records:
+        print("No .csv, .hea or .npy records found")
+        return 2
+    os.makedirs(arguments.output, exist_ok=True)
+
+    failures = 0
+    written = set()  # outputs of this run, never overwritten
+    with ProcessPoolExecutor(
+        max_workers=arguments.jobs, initializer=init_worker, initargs=(design,)
+    ) as executor:
+        futures = []
+        for record, name in zip(records, output_names(records)):
+            outputs = record_outputs(
+                name, arguments.output, arguments.correct_phase, arguments.format
+            )
+            keys = {os.path.normcase(os.path.abspath(output)) for output in outputs}
+            if keys & written:
+                futures.append(None)
+                continue
+            written |= keys
+            futures.append(executor.submit(filter_record, record, outputs))
+
+        for record, future in zip(records, futures):
+            if future is None:
+                failures += 1
+                print(
+                    f"Error filtering {record}: its output was already written",
+                    file=sys.stderr,
+                )
+                continue
+            try:
+                outputs = future.result()
+                print(f"{record} -> {', '.join(outputs)}")
+            except Exception as e:
+                failures += 1
+                print(f"Error filtering {record}: {e}", file=sys.stderr)
+
+    print(f"Filtered {len(records) - failures} of {len(records)} records")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
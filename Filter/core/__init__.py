@@ -0,0 +1,33 @@
+"""
+The filter design core: design model, response evaluation, filtering,
+all-pass cascades and phase correction, in NumPy/SciPy only. It does not
+import Qt, so designs can be applied to data without the GUI.
+"""
+
+from core.all_pass import (
+    AllPassRegistry,
+    all_pass_phase,
+    all_pass_roots,
+    all_pass_sos,
+    coefficient_key,
+)
+from core.cascade import PhaseCascade, anchor_phase
+from core.design import FilterDesign
+from core.filter_file import (
+    ROOT_LABELS,
+    FilterFileError,
+    load_design,
+    read_filter_file,
+)
+from core.filtering import StreamingFilter, filter_signal
+from core.response import (
+    IncrementalResponse,
+    frequency_grid,
+    wrap_phase,
+    zpk_response,
+)
+from core.roots import RootRegistry
+from core.signal_io import open_signal, write_signal
+from core.sos import IDENTITY_SOS, load_scipy_signal, zpk_to_sos
+from core.spatial import SpatialGrid
+from core.stats import SignalStats
@@ -0,0 +1,115 @@
+import numpy as np
+from core.cascade import anchor_phase
+
+
+def all_pass_roots(coefficients):
+    """
+    Zeros and poles of first-order all-pass sections: the pole is 'a' and the
+    zero is its reflection 1 / conj(a) across the unit circle.
+    """
+    a = np.asarray(coefficients, dtype=complex)
+    return 1 / np.conj(a), a
+
+
+def all_pass_sos(coefficients):
+    """
+    One second-order section per all-pass coefficient, as an N x 6 array.
+    """
+    zeros, poles = all_pass_roots(np.atleast_1d(coefficients))
+    sos = np.zeros((len(poles), 6), dtype=complex)
+    sos[:, 0] = sos[:, 3] = 1
+    sos[:, 1] = -zeros
+    sos[:, 4] = -poles
+    return sos
+
+
+def all_pass_phase(coefficients, frequencies):
+    """
+    Unwrapped phase responses of N all-pass sections over a frequency grid,
+    in one batched call (an N x grid array).
+
+    With D = 1 - a e^(-jw), each section is H = -(1 / conj(a)) e^(-jw) conj(D) / D,
+    so its phase is angle(-1 / conj(a)) - w - 2 angle(D).
+    """
+    a = np.atleast_1d(np.asarray(coefficients, dtype=complex)).reshape(-1, 1)
+    denominator = 1 - a * np.exp(-1j * frequencies)
+    phase = np.angle(-1 / np.conj(a)) - frequencies - 2 * np.angle(denominator)
+
+    # angle(D) only wraps when |a| > 1
+    return anchor_phase(np.unwrap(phase, axis=1))
+
+
+# Coefficients closer than this on both axes are the same all-pass filter
+COEFFICIENT_TOLERANCE = 1e-9
+
+
+def coefficient_key(a, tolerance=COEFFICIENT_TOLERANCE):
+    """
+    The 'a' coefficient quantized to the tolerance, as a hashable key.
+    """
+    a = complex(a)
+    return round(a.real / tolerance), round(a.imag / tolerance)
+
+
+class AllPassEntry:
+    """
+    An all-pass filter known to the application: its library button, its
+    cached phase response and, while cascaded, its plotted zero and pole.
+    """
+
+    def __init__(self, a, button=None, phase=None):
+        self.a = a
+        self.button = button
+        self.phase = phase
+        self.zero_item = None
+        self.pole_item = None
+
+
+class AllPassRegistry:
+    """
+    The all-pass filters hashed on their quantized coefficient, so adding,
+    finding a duplicate and removing are O(1) however large the library.
+    """
+
+    def __init__(self, tolerance=COEFFICIENT_TOLERANCE):
+        self.tolerance = tolerance
+        self.entries = {}  # quantized coefficient -> AllPassEntry
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, a):
+        return self.find(a) is not None
+
+    def __iter__(self):
+        return iter(self.entries.values())
+
+    def find(self, a):
+        # Equal coefficients may round to neighbouring keys, look around too
+        a = complex(a)
+        real, imag = coefficient_key(a, self.tolerance)
+        for key in ((real + i, imag + j) for i in (0, -1, 1) for j in (0, -1, 1)):
+            entry = self.entries.get(key)
+            if entry is not None and (
+                abs(entry.a.real - a.real) <= self.tolerance
+                and abs(entry.a.imag - a.imag) <= self.tolerance
+            ):
+                return entry
+        return None
+
+    def add(self, a, button=None, phase=None):
+        if a in self:
+            raise ValueError(f"the all-pass filter a = {a} already exists")
+        entry = AllPassEntry(complex(a), button, phase)
+        self.entries[coefficient_key(entry.a, self.tolerance)] = entry
+        return entry
+
+    def remove(self, a):
+        entry = self.find(a)
+        if entry is None:
+            raise KeyError(a)
+        del self.entries[coefficient_key(entry.a, self.tolerance)]
+        return entry
+
+    def clear(self):
+        self.entries.clear()
@@ -0,0 +1,42 @@
+import numpy as np
+from core.response import frequency_grid
+
+
+def anchor_phase(phase):
+    """
+    Shift unwrapped phases (along the last axis) by whole turns so they start
+    in [-pi, pi], the way np.unwrap(np.angle(response)) does.
+    """
+    return phase - 2 * np.pi * np.round(phase[..., :1] / (2 * np.pi))
+
+
+class PhaseCascade:
+    """
+    Phase response of a cascade of filters on a shared frequency grid.
+    Cascading multiplies the responses, so the unwrapped phases add up and
+    toggling one member only costs one vector addition or subtraction.
+    """
+
+    def __init__(self, worN=8000):
+        self.frequencies = frequency_grid(worN)
+        self.members = {}  # key -> unwrapped phase of the member
+        self.total = np.zeros_like(self.frequencies)
+
+    def __len__(self):
+        return len(self.members)
+
+    def __contains__(self, key):
+        return key in self.members
+
+    def add(self, key, phase):
+        self.members[key] = phase
+        self.total += phase
+
+    def remove(self, key):
+        self.total -= self.members.pop(key)
+        if not self.members:
+            # Nothing left to add up, drop any rounding residue
+            self.total[:] = 0
+
+    def phase(self):
+        return anchor_phase(self.total)
@@ -0,0 +1,68 @@
+import numpy as np
+from core.all_pass import all_pass_phase, all_pass_sos
+from core.cascade import anchor_phase
+from core.filtering import filter_signal
+from core.response import frequency_grid, zpk_response
+from core.sos import IDENTITY_SOS, zpk_to_sos
+
+
+class FilterDesign:
+    """
+    A zero/pole design and its cascade of all-pass filters, as plain NumPy
+    arrays. Everything needed to apply a design to data lives here, so it
+    works without a running Qt GUI.
+    """
+
+    def __init__(self, zeros=(), poles=(), all_pass=()):
+        self.set_roots(zeros, poles)
+        self.set_all_pass(all_pass)
+
+    def set_roots(self, zeros, poles):
+        # Copied, the design must not change with the arrays it was built from
+        self.zeros = np.array(zeros, dtype=complex).ravel()
+        self.poles = np.array(poles, dtype=complex).ravel()
+        self.sos = zpk_to_sos(self.zeros, self.poles, 1)
+
+    def set_all_pass(self, coefficients):
+        self.all_pass = np.asarray(coefficients, dtype=complex).ravel()
+
+    def is_empty(self):
+        return len(self.zeros) == 0 and len(self.poles) == 0
+
+    # RESPONSES
+    def response(self, worN=512):
+        """
+        Frequencies, magnitude (dB) and wrapped phase of the design.
+        """
+        frequencies, magnitude_db, phase = zpk_response(self.zeros, self.poles, worN)
+        return frequencies, magnitude_db, np.angle(np.exp(1j * phase))
+
+    def unwrapped_phase(self, worN=8000):
+        _, _, phase = zpk_response(self.zeros, self.poles, worN)
+        return anchor_phase(np.unwrap(phase))
+
+    def all_pass_phase(self, worN=8000):
+        # The phases of all the cascaded all-pass filters add up
+        if len(self.all_pass) == 0:
+            return np.zeros(worN)
+        return all_pass_phase(self.all_pass, frequency_grid(worN)).sum(axis=0)
+
+    def corrected_phase(self, worN=8000):
+        """
+        Phase of the design followed by its all-pass cascade.
+        """
+        return anchor_phase(self.unwrapped_phase(worN) + self.all_pass_phase(worN))
+
+    # FILTERING
+    def all_pass_sos(self):
+        if len(self.all_pass) == 0:
+            return IDENTITY_SOS.copy()
+        return all_pass_sos(self.all_pass)
+
+    def filter(self, data, progress=None):
+        return filter_signal(self.sos, data, progress)
+
+    def correct_phase(self, filtered_data, progress=None):
+        # The cascade output is flipped in sign, as the application always did
+        corrected = filter_signal(self.all_pass_sos(), filtered_data, progress)
+        return np.negative(corrected, out=corrected)
@@ -0,0 +1,93 @@
+import numpy as np
+from core.design import FilterDesign
+
+# Row labels of the filter files written by the application
+ROOT_LABELS = ("zero", "pole", "allpass zero", "allpass pole")
+
+MAX_REPORTED_ERRORS = 10
+
+
+class FilterFileError(ValueError):
+    """
+    A filter file with malformed rows. errors holds (line number, message)
+    for every bad row, the message lists the first ones.
+    """
+
+    def __init__(self, file_path, errors):
+        self.file_path = file_path
+        self.errors = errors
+        lines = [f"line {line}: {message}" for line, message in errors]
+        if len(lines) > MAX_REPORTED_ERRORS:
+            hidden = len(lines) - MAX_REPORTED_ERRORS
+            lines = lines[:MAX_REPORTED_ERRORS] + [f"... and {hidden} more"]
+        super(FilterFileError, self).__init__(
+            f"{file_path} has {len(errors)} bad row(s):\n" + "\n".join(lines)
+        )
+
+
+def read_filter_file(file_path):
+    """
+    Read a filter file exported by the application into complex arrays,
+    keyed by the row label ("zero", "pole", "allpass zero", "allpass pole").
+    The coordinates of all the rows are converted at once; any bad row raises
+    a FilterFileError that lists each of them by line number.
+    """
+    with open(file_path, "r") as file:
+        lines = file.read().splitlines()
+
+    # Line numbers count from 1 and the first line holds the column titles
+    rows = [
+        (number, line.split(","))
+        for number, line in enumerate(lines[1:], start=2)
+        if line.strip(", \t")
+    ]
+    errors = [
+        (number, f"expected a label, x and y, got {len(fields)} field(s)")
+        for number, fields in rows
+        if len(fields) < 3
+    ]
+    rows = [(number, fields) for number, fields in rows if len(fields) >= 3]
+
+    numbers = np.array([number for number, _ in rows], dtype=int)
+    labels = np.array([fields[0].strip() for _, fields in rows], dtype=str)
+    coordinates = np.array(
+        [(fields[1].strip(), fields[2].strip()) for _, fields in rows], dtype=str
+    ).reshape(-1, 2)
+
+    unknown = ~np.isin(labels, ROOT_LABELS)
+    errors += [
+        (int(number), f"unknown row label {str(label)!r}")
+        for number, label in zip(numbers[unknown], labels[unknown])
+    ]
+
+    try:
+        values = coordinates.astype(float)
+    except ValueError:
+        values = np.full(coordinates.shape, np.nan)
+        errors += parse_coordinates(numbers, coordinates, values)
+    if errors:
+        raise FilterFileError(file_path, sorted(errors))
+
+    roots = values[:, 0] + 1j * values[:, 1]
+    return {label: roots[labels == label] for label in ROOT_LABELS}
+
+
+def parse_coordinates(numbers, coordinates, values):
+    # Only reached for files with bad numbers: convert row by row to find them
+    errors = []
+    for row, (number, pair) in enumerate(zip(numbers, coordinates)):
+        for column, (axis, text) in enumerate(zip("xy", pair)):
+            try:
+                values[row, column] = float(text)
+            except ValueError:
+                errors.append((int(number), f"{axis} {str(text)!r} is not a number"))
+    return errors
+
+
+def load_design(file_path):
+    """
+    Build a FilterDesign from a filter file. Each all-pass filter is known by
+    its pole, which is its 'a' coefficient.
+    """
+    roots = read_filter_file(file_path)
+    return FilterDesign(roots["zero"], roots["pole"], roots["allpass pole"])
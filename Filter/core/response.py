@@ -0,0 +1,160 @@
+import numpy as np
+
+
+def frequency_grid(worN=512):
+    # The same grid freqz uses: worN frequencies on [0, pi)
+    return np.linspace(0, np.pi, worN, endpoint=False)
+
+
+def wrap_phase(phase):
+    return np.angle(np.exp(1j * phase))
+
+
+def zpk_response(zeros, poles, worN=512):
+    """
+    Magnitude (dB) and phase of H(e^jw), evaluated straight from the zeros and
+    poles as products of distances and sums of angles on the unit circle.
+    No polynomial is expanded, so clustered high-order designs stay accurate.
+    """
+    frequencies = frequency_grid(worN)
+    unit_circle = np.exp(1j * frequencies)
+    zeros = np.asarray(zeros, dtype=complex).reshape(-1, 1)
+    poles = np.asarray(poles, dtype=complex).reshape(-1, 1)
+
+    zero_factors = unit_circle - zeros
+    pole_factors = unit_circle - poles
+
+    # A zero exactly on the grid gives -inf dB, just like freqz
+    with np.errstate(divide="ignore"):
+        magnitude = 20 * (
+            np.log10(np.abs(zero_factors)).sum(axis=0)
+            - np.log10(np.abs(pole_factors)).sum(axis=0)
+        )
+
+    # The expanded polynomials also delay by (zeros - poles) samples
+    phase = (
+        np.angle(zero_factors).sum(axis=0)
+        - np.angle(pole_factors).sum(axis=0)
+        - (len(zeros) - len(poles)) * frequencies
+    )
+    return frequencies, magnitude, phase
+
+
+class IncrementalResponse:
+    """
+    Frequency response kept as cached per-root factors on a fixed grid.
+    H(e^jw) is a product of root factors, so moving one root only divides its
+    old factor out and multiplies the new one in (a subtraction and an
+    addition in the log domain). The running sums are rebuilt from the cached
+    factors every few updates to stop rounding drift from accumulating.
+
+    The factors of the zeros and of the poles are rows of two arrays laid
+    out like the slots of their RootRegistry: a root is added at the end, and
+    a removed root's row is filled by the last row. The zeros and poles are
+    told apart by is_pole.
+    """
+
+    def __init__(self, worN=512, renormalize_every=64, capacity=64):
+        self.frequencies = frequency_grid(worN)
+        self.unit_circle = np.exp(1j * self.frequencies)
+        self.renormalize_every = renormalize_every
+        # is_pole -> log10 distances and angles, one row per root
+        self.log_distances = {
+            is_pole: np.zeros((capacity, worN)) for is_pole in (False, True)
+        }
+        self.angles = {is_pole: np.zeros((capacity, worN)) for is_pole in (False, True)}
+        self.counts = {False: 0, True: 0}
+        self.reset([], [])
+
+    def root_factors(self, roots):
+        roots = np.asarray(roots, dtype=complex).reshape(-1, 1)
+        difference = self.unit_circle - roots
+        # Clamp roots lying exactly on the grid, -inf would poison the sums
+        distance = np.maximum(np.abs(difference), np.finfo(float).tiny)
+        return np.log10(distance), np.angle(difference)
+
+    def reserve(self, is_pole, count):
+        # Double the capacity until count rows fit, as RootRegistry does
+        capacity = len(self.log_distances[is_pole])
+        if count > capacity:
+            capacity = max(count, 2 * capacity)
+            used = self.counts[is_pole]
+            for factors in (self.log_distances, self.angles):
+                grown = np.zeros((capacity, len(self.frequencies)))
+                grown[:used] = factors[is_pole][:used]
+                factors[is_pole] = grown
+
+    def reset(self, zeros, poles):
+        """
+        Rebuild from scratch, from the zeros and poles as whole arrays in the
+        order of their registry slots.
+        """
+        for is_pole, roots in ((False, zeros), (True, poles)):
+            count = len(roots)
+            self.reserve(is_pole, count)
+            log_distances, angles = self.root_factors(roots)
+            self.log_distances[is_pole][:count] = log_distances
+            self.angles[is_pole][:count] = angles
+            self.counts[is_pole] = count
+        self.renormalize()
+
+    def summed_factors(self, is_pole):
+        count = self.counts[is_pole]
+        return (
+            self.log_distances[is_pole][:count].sum(axis=0),
+            self.angles[is_pole][:count].sum(axis=0),
+        )
+
+    def renormalize(self):
+        zero_log_distances, zero_angles = self.summed_factors(False)
+        pole_log_distances, pole_angles = self.summed_factors(True)
+        self.log_magnitude = zero_log_distances - pole_log_distances
+        self.angle = zero_angles - pole_angles
+        self.delay = self.counts[False] - self.counts[True]  # zeros minus poles
+        self.updates = 0
+
+    def add(self, root, is_pole=False):
+        slot = self.counts[is_pole]
+        self.reserve(is_pole, slot + 1)
+        log_distance, angle = (factor[0] for factor in self.root_factors([root]))
+        self.log_distances[is_pole][slot] = log_distance
+        self.angles[is_pole][slot] = angle
+        self.counts[is_pole] += 1
+        sign = -1 if is_pole else 1
+        self.log_magnitude += sign * log_distance
+        self.angle += sign * angle
+        self.delay += sign
+        self.count_update()
+
+    def move(self, slot, root, is_pole=False):
+        log_distance, angle = (factor[0] for factor in self.root_factors([root]))
+        sign = -1 if is_pole else 1
+        self.log_magnitude += sign * (log_distance - self.log_distances[is_pole][slot])
+        self.angle += sign * (angle - self.angles[is_pole][slot])
+        self.log_distances[is_pole][slot] = log_distance
+        self.angles[is_pole][slot] = angle
+        self.count_update()
+
+    def remove(self, slot, is_pole=False):
+        sign = -1 if is_pole else 1
+        self.log_magnitude -= sign * self.log_distances[is_pole][slot]
+        self.angle -= sign * self.angles[is_pole][slot]
+        self.delay -= sign
+        self.counts[is_pole] -= 1
+        last = self.counts[is_pole]
+        # The last root takes the freed row
+        self.log_distances[is_pole][slot] = self.log_distances[is_pole][last]
+        self.angles[is_pole][slot] = self.angles[is_pole][last]
+        self.count_update()
+
+    def count_update(self):
+        self.updates += 1
+        if self.updates >= self.renormalize_every:
+            self.renormalize()
+
+    def magnitude_db(self):
+        return 20 * self.log_magnitude
+
+    def phase(self):
+        # The same (zeros - poles) samples delay as the expanded polynomials
+        return self.angle - self.delay * self.frequencies
@@ -0,0 +1,63 @@
+import numpy as np
+
+
+class RootRegistry:
+    """
+    Zeros or poles in a preallocated complex array, each known by a stable
+    integer id. The array stays compact: a removed root's slot is filled by
+    the last root, so adding, moving and removing are all O(1), and roots
+    reads the live values without copying them.
+    """
+
+    def __init__(self, capacity=64):
+        self.values = np.zeros(capacity, dtype=complex)
+        self.slot_ids = np.zeros(capacity, dtype=np.int64)  # id of each slot
+        self.slots = {}  # id -> slot
+        self.count = 0
+        self.next_id = 0
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, root_id):
+        return root_id in self.slots
+
+    @property
+    def roots(self):
+        return self.values[: self.count]
+
+    @property
+    def ids(self):
+        return self.slot_ids[: self.count]
+
+    def get(self, root_id):
+        return complex(self.values[self.slots[root_id]])
+
+    def add(self, root):
+        if self.count == len(self.values):
+            # Double the capacity, so adding stays O(1) on average
+            self.values = np.resize(self.values, 2 * len(self.values))
+            self.slot_ids = np.resize(self.slot_ids, 2 * len(self.slot_ids))
+        root_id = self.next_id
+        self.next_id += 1
+        self.values[self.count] = root
+        self.slot_ids[self.count] = root_id
+        self.slots[root_id] = self.count
+        self.count += 1
+        return root_id
+
+    def move(self, root_id, root):
+        self.values[self.slots[root_id]] = root
+
+    def remove(self, root_id):
+        slot = self.slots.pop(root_id)
+        self.count -= 1
+        if slot != self.count:
+            # The last root takes the freed slot
+            self.values[slot] = self.values[self.count]
+            self.slot_ids[slot] = self.slot_ids[self.count]
+            self.slots[int(self.slot_ids[slot])] = slot
+
+    def clear(self):
+        self.slots.clear()
+        self.count = 0
@@ -0,0 +1,361 @@
+import abc
+import os
+import tempfile
+import uuid
+from contextlib import contextmanager
+from functools import partial
+
+import numpy as np
+
+SIGNAL_EXTENSIONS = (".csv", ".hea", ".dat", ".npy")
+
+# Written to WFDB headers when the signal's sampling frequency is unknown
+DEFAULT_SAMPLING_FREQUENCY = 250
+
+BLOCK_SIZE = 1 << 16  # samples read, filtered or scanned at a time
+SPILL_SIZE = 1 << 22  # signals longer than this are kept on disk, not in RAM
+
+# WFDB sample formats stored as plain integers, which can be memory-mapped
+# as they are, with the value each format uses for a missing sample
+MEMMAP_FORMATS = {
+    "16": (np.dtype("<i2"), -(1 << 15)),
+    "61": (np.dtype(">i2"), -(1 << 15)),
+    "32": (np.dtype("<i4"), -(1 << 31)),
+}
+
+
+def iter_blocks(data, block_size=BLOCK_SIZE):
+    """
+    Yield (start, block) over a signal, so long signals and signal sources
+    are never copied into memory all at once.
+    """
+    for start in range(0, len(data), block_size):
+        yield start, np.asarray(data[start : start + block_size], dtype=float)
+
+
+def allocate_signal(shape, dtype=float):
+    # Long outputs go to an anonymous temporary file the OS pages in and out
+    if np.prod(shape) <= SPILL_SIZE:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(tempfile.TemporaryFile(), dtype=dtype, mode="w+", shape=shape)
+
+
+class SignalSource(abc.ABC):
+    """
+    A read-only signal that only reads the samples it is sliced for. It has
+    a shape, (samples,) or (samples, channels), and supports integer and
+    slice indexing along the samples like an array. Records also know their
+    sampling frequency (Hz) and the physical units of each channel.
+    """
+
+    channel_names = None
+    sampling_frequency = None
+    units = None
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                return np.asarray(self)[key]
+            return self.read(start, max(start, stop))
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("signal index out of range")
+        return self.read(key, key + 1)[0]
+
+    def __array__(self, dtype=None, copy=None):
+        data = self.read(0, len(self))
+        return data if dtype is None else data.astype(dtype)
+
+    @abc.abstractmethod
+    def read(self, start, stop):
+        """
+        Samples start to stop, as an array of the signal's dimensions.
+        """
+
+
+class WfdbSignal(SignalSource):
+    """
+    All the channels of a WFDB record. Formats stored as plain integers are
+    read through memory maps of the .dat files, others sample range by sample
+    range.
+    """
+
+    def __init__(self, file_path):
+        import wfdb
+
+        self.record_name = os.path.splitext(file_path)[0]
+        header = wfdb.rdheader(self.record_name)
+        self.channel_names = header.sig_name
+        self.sampling_frequency = header.fs
+        self.units = header.units
+        self.gain = np.asarray(header.adc_gain, dtype=float)
+        self.baseline = np.asarray(header.baseline, dtype=float)
+        self.length = header.sig_len
+        self.files = self.map_files(header)
+        self.shape = (self.length, header.n_sig)
+
+    def map_files(self, header):
+        samples_per_frame = header.samps_per_frame or [1] * header.n_sig
+        skew = header.skew or [None] * header.n_sig
+        if any(
+            header.fmt[i] not in MEMMAP_FORMATS or samples_per_frame[i] != 1 or skew[i]
+            for i in range(header.n_sig)
+        ):
+            return None
+
+        # The channels stored in one file are interleaved sample by sample
+        files = []
+        for file_name in dict.fromkeys(header.file_name):
+            group = [i for i, name in enumerate(header.file_name) if name == file_name]
+            if len({header.fmt[i] for i in group}) != 1:
+                return None
+            dtype, invalid = MEMMAP_FORMATS[header.fmt[group[0]]]
+            path = os.path.join(os.path.dirname(self.record_name), file_name)
+            offset = header.byte_offset[group[0]] or 0
+            if self.length is None:
+                self.length = (os.path.getsize(path) - offset) // (
+                    dtype.itemsize * len(group)
+                )
+            samples = np.memmap(
+                path,
+                dtype=dtype,
+                mode="r",
+                offset=offset,
+                shape=(self.length, len(group)),
+            )
+            files.append((group, samples, invalid))
+        return files
+
+    def read(self, start, stop):
+        if stop <= start:
+            # rdrecord refuses empty sample ranges
+            return np.empty((0, self.shape[1]))
+        if self.files is None:
+            import wfdb
+
+            record = wfdb.rdrecord(self.record_name, sampfrom=start, sampto=stop)
+            return record.p_signal
+
+        # Digital to physical units, the way wfdb does it for the whole record
+        physical = np.empty((len(range(start, stop)), self.shape[1]))
+        for group, samples, invalid in self.files:
+            digital = samples[start:stop]
+            values = (digital - self.baseline[group]) / self.gain[group]
+            values[digital == invalid] = np.nan
+            physical[:, group] = values
+        return physical
+
+
+class CsvSignal(SignalSource):
+    """
+    The first column of a CSV file, parsed in chunks into a float64 array
+    that is spilled to a temporary file for long signals.
+    """
+
+    def __init__(self, file_path, chunk_size=BLOCK_SIZE, progress=None):
+        import pandas as pd
+
+        # The parsed chunks are written straight to disk, never all held at once
+        spill = tempfile.TemporaryFile()
+        length = 0
+        file_size = max(os.path.getsize(file_path), 1)
+        with open(file_path, "rb") as file:
+            for chunk in pd.read_csv(file, usecols=[0], chunksize=chunk_size):
+                values = chunk.iloc[:, 0].to_numpy(dtype=float)
+                spill.write(values.tobytes())
+                length += len(values)
+                if progress is not None:
+                    progress(min(file.tell() / file_size, 1.0))
+        spill.flush()
+
+        if length <= SPILL_SIZE:
+            spill.seek(0)
+            self.samples = np.frombuffer(spill.read(), dtype=float)
+            spill.close()
+        else:
+            self.samples = np.memmap(spill, dtype=float, mode="r", shape=length)
+        self.shape = (length,)
+
+    def read(self, start, stop):
+        return np.asarray(self.samples[start:stop])
+
+
+def open_signal(file_path, progress=None):
+    """
+    Open all the channels of a WFDB record (.hea/.dat), as a (samples,
+    channels) signal, the first column of a CSV file or a NumPy .npy array as
+    a signal that reads its samples on demand.
+    progress, if given, is called with the fraction of the file parsed so far.
+    """
+    if file_path.endswith(".hea") or file_path.endswith(".dat"):
+        return WfdbSignal(file_path)
+    elif file_path.endswith(".csv"):
+        return CsvSignal(file_path, progress=progress)
+    elif file_path.endswith(".npy"):
+        return np.load(file_path, mmap_mode="r")
+    raise ValueError(f"Unsupported signal file: {file_path}")
+
+
+def write_signal(file_path, data, progress=None, source=None):
+    """
+    Write a signal block by block, in the format its extension names: text
+    .csv, NumPy .npy, raw little-endian float32/float64 (.f32/.f64) or a
+    WFDB record (.hea/.dat). progress, if given, is called with the fraction
+    written so far. A WFDB record keeps the sampling frequency, units and
+    channel names of source, the signal data was computed from, if given.
+    The files only appear once completely written.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in SIGNAL_WRITERS:
+        raise ValueError(f"Unsupported signal file: {file_path}")
+    if SIGNAL_WRITERS[extension] is write_wfdb:
+        write_wfdb(file_path, data, progress, source)
+    else:
+        with replaced_when_done(file_path) as (partial_path,):
+            SIGNAL_WRITERS[extension](partial_path, data, progress)
+
+
+@contextmanager
+def replaced_when_done(*file_paths):
+    """
+    Yield hidden temporary paths next to file_paths, which replace them once
+    all are written. If writing fails or is cancelled, they are deleted and
+    file_paths are left as they were, so no truncated file is ever left.
+    """
+    partial_paths = []
+    for file_path in file_paths:
+        directory, name = os.path.split(file_path)
+        root, extension = os.path.splitext(name)
+        # Unique, so an export cancelled for a new one never shares its files
+        partial_paths.append(
+            os.path.join(directory, f".{root}.{uuid.uuid4().hex[:8]}{extension}")
+        )
+    try:
+        yield partial_paths
+    except BaseException:
+        for partial_path in partial_paths:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+        raise
+    for partial_path, file_path in zip(partial_paths, file_paths):
+        os.replace(partial_path, file_path)
+
+
+def write_blocks(data, progress=None):
+    # The blocks to write, reporting the fraction written after each one
+    for start, block in iter_blocks(data):
+        yield start, block
+        if progress is not None:
+            progress((start + len(block)) / len(data))
+
+
+def write_csv(file_path, data, progress=None):
+    with open(file_path, "w") as file:
+        for _, block in write_blocks(data, progress):
+            np.savetxt(file, block, delimiter=",")
+
+
+def write_npy(file_path, data, progress=None):
+    if len(data) == 0:
+        np.save(file_path, np.zeros(np.shape(data)))
+        return
+
+    # Filled through a memory map, the array is never whole in memory
+    output = np.lib.format.open_memmap(
+        file_path, mode="w+", dtype=float, shape=np.shape(data)
+    )
+    for start, block in write_blocks(data, progress):
+        output[start : start + len(block)] = block
+    output.flush()
+    del output
+
+
+def write_raw(file_path, data, progress=None, dtype="<f8"):
+    # Samples one after the other, channels interleaved, with no header at all
+    with open(file_path, "wb") as file:
+        for _, block in write_blocks(data, progress):
+            file.write(block.astype(dtype).tobytes())
+
+
+def write_wfdb(file_path, data, progress=None, source=None):
+    """
+    Write a WFDB record in format 16. The gain and baseline of each channel
+    map its range over the whole 16 bits, which takes a first pass over the
+    signal to find. The sampling frequency, units and channel names are those
+    of source, or of data when no source is given.
+    """
+    record_name = os.path.splitext(file_path)[0]
+    name = os.path.basename(record_name)
+    channels = np.shape(data)[1] if np.ndim(data) == 2 else 1
+
+    low = np.full(channels, np.inf)
+    high = np.full(channels, -np.inf)
+    for _, block in iter_blocks(data):
+        block = block.reshape(len(block), channels)
+        low = np.fmin(low, np.fmin.reduce(block, axis=0))
+        high = np.fmax(high, np.fmax.reduce(block, axis=0))
+    low[~np.isfinite(low)] = 0
+    high[~np.isfinite(high)] = 0
+
+    # -32768 is left for the missing (NaN) samples
+    gain = 65534 / np.where(high > low, high - low, 1.0)
+    baseline = np.round(-32767 - low * gain).astype(int)
+
+    source = data if source is None else source
+    sampling_frequency = (
+        getattr(source, "sampling_frequency", None) or DEFAULT_SAMPLING_FREQUENCY
+    )
+    names = getattr(source, "channel_names", None) or [
+        f"ch{channel + 1}" for channel in range(channels)
+    ]
+    # Units follow the gain and baseline as "/mV", unknown ones are left out
+    units = [
+        f"/{unit}" if unit else ""
+        for unit in (getattr(source, "units", None) or [None] * channels)
+    ]
+
+    # The header names the .dat file of the record, not its partial path
+    record_files = (record_name + ".dat", record_name + ".hea")
+    with replaced_when_done(*record_files) as (data_path, header_path):
+        checksum = np.zeros(channels, dtype=np.int64)
+        initial_value = np.zeros(channels, dtype=int)
+        with open(data_path, "wb") as file:
+            for start, block in write_blocks(data, progress):
+                block = block.reshape(len(block), channels)
+                digital = np.clip(np.round(block * gain + baseline), -32767, 32767)
+                digital[np.isnan(block)] = -32768
+                digital = digital.astype("<i2")
+                if start == 0:
+                    initial_value = digital[0]
+                checksum += digital.sum(axis=0, dtype=np.int64)
+                file.write(digital.tobytes())
+
+        # The checksum is the 16-bit sum of the samples, as a signed number
+        checksum = (checksum + 32768) % 65536 - 32768
+        with open(header_path, "w") as header:
+            header.write(f"{name} {channels} {sampling_frequency:.12g} {len(data)}\n")
+            for channel in range(channels):
+                header.write(
+                    f"{name}.dat 16 {gain[channel]:.12g}({baseline[channel]})"
+                    f"{units[channel]} 16 0 {initial_value[channel]} "
+                    f"{checksum[channel]} 0 {names[channel]}\n"
+                )
+
+
+SIGNAL_WRITERS = {
+    ".csv": write_csv,
+    ".npy": write_npy,
+    ".f32": partial(write_raw, dtype="<f4"),
+    ".f64": partial(write_raw, dtype="<f8"),
+    ".hea": write_wfdb,
+    ".dat": write_wfdb,
+}
@@ -0,0 +1,59 @@
+import numpy as np
+
+# A single pass-through section, used for empty designs
+IDENTITY_SOS = np.array([[1.0, 0.0, 0.0, 1.0, 0.0, 0.0]])
+
+
+def load_scipy_signal(progress=None):
+    """
+    Import scipy.signal ahead of the first design, off the UI thread.
+    """
+    import scipy.signal  # noqa: F401
+
+
+def zpk_to_sos(zeros, poles, gain=1):
+    """
+    Group the zeros and poles into second-order sections (biquads).
+    Designs closed under conjugation get the real sections of zpk2sos, other
+    designs get complex sections pairing each pole with its nearest zero.
+    """
+    zeros = np.atleast_1d(np.asarray(zeros, dtype=complex))
+    poles = np.atleast_1d(np.asarray(poles, dtype=complex))
+    if len(zeros) == 0 and len(poles) == 0:
+        sos = IDENTITY_SOS.copy()
+        sos[0, :3] *= gain
+        return sos
+
+    # scipy.signal is imported on first use, it dominates the core import time;
+    # the application loads it early with load_scipy_signal
+    from scipy.signal import zpk2sos
+
+    try:
+        return zpk2sos(zeros, poles, gain)
+    except ValueError:
+        # Complex roots without matching conjugates
+        return complex_zpk_to_sos(zeros, poles, gain)
+
+
+def complex_zpk_to_sos(zeros, poles, gain=1):
+    n_sections = (max(len(zeros), len(poles)) + 1) // 2
+
+    # Pad both sides with roots at the origin, as zpk2sos does
+    zeros = np.concatenate([zeros, np.zeros(2 * n_sections - len(zeros))])
+    poles = np.concatenate([poles, np.zeros(2 * n_sections - len(poles))])
+
+    # Poles closest to the unit circle are paired first with their nearest zeros
+    poles = poles[np.argsort(np.abs(1 - np.abs(poles)))]
+    remaining_zeros = list(zeros)
+    paired_zeros = []
+    for pole in poles:
+        nearest = int(np.argmin(np.abs(np.array(remaining_zeros) - pole)))
+        paired_zeros.append(remaining_zeros.pop(nearest))
+
+    sos = np.zeros((n_sections, 6), dtype=complex)
+    for section in range(n_sections):
+        pair = slice(2 * section, 2 * section + 2)
+        sos[section, :3] = np.poly(paired_zeros[pair])
+        sos[section, 3:] = np.poly(poles[pair])
+    sos[0, :3] *= gain
+    return sos
@@ -0,0 +1,72 @@
+import math
+
+
+class SpatialGrid:
+    """
+    Hit-testing index over points of the complex plane, bucketed in square
+    cells. A query only visits the cells its radius overlaps, so finding the
+    point nearest to a click costs O(1) on average however many points the
+    index holds.
+    """
+
+    def __init__(self, cell_size=0.1):
+        self.cell_size = cell_size
+        self.cells = {}  # (column, row) -> {key: point}
+        self.points = {}  # key -> (cell, point)
+
+    def __len__(self):
+        return len(self.points)
+
+    def __contains__(self, key):
+        return key in self.points
+
+    def cell(self, point):
+        return (
+            math.floor(point.real / self.cell_size),
+            math.floor(point.imag / self.cell_size),
+        )
+
+    def insert(self, key, point):
+        point = complex(point)
+        cell = self.cell(point)
+        self.cells.setdefault(cell, {})[key] = point
+        self.points[key] = (cell, point)
+
+    def move(self, key, point):
+        point = complex(point)
+        cell, _ = self.points[key]
+        if self.cell(point) != cell:
+            self.remove(key)
+            self.insert(key, point)
+        else:
+            self.cells[cell][key] = point
+            self.points[key] = (cell, point)
+
+    def remove(self, key):
+        cell, _ = self.points.pop(key)
+        bucket = self.cells[cell]
+        del bucket[key]
+        if not bucket:
+            del self.cells[cell]
+
+    def clear(self):
+        self.cells.clear()
+        self.points.clear()
+
+    def nearest(self, point, radius):
+        """
+        The key of the point nearest to point, if one lies within radius,
+        else None.
+        """
+        point = complex(point)
+        first_column, first_row = self.cell(point - complex(radius, radius))
+        last_column, last_row = self.cell(point + complex(radius, radius))
+
+        nearest_key, nearest_distance = None, radius
+        for column in range(first_column, last_column + 1):
+            for row in range(first_row, last_row + 1):
+                for key, candidate in self.cells.get((column, row), {}).items():
+                    distance = abs(candidate - point)
+                    if distance <= nearest_distance:
+                        nearest_key, nearest_distance = key, distance
+        return nearest_key
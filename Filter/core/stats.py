@@ -0,0 +1,50 @@
+import numpy as np
+from core.signal_io import iter_blocks
+
+
+class SignalStats:
+    """
+    Minimum and maximum of a signal, computed once for the whole signal and
+    updated in O(1) for every appended sample. (samples, channels) signals
+    keep one minimum and maximum per channel. progress, if given, is called
+    with the fraction of the signal scanned after each block.
+    """
+
+    def __init__(self, data=(), progress=None):
+        self.count = 0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        # Scanned block by block, the signal may be a source read from disk
+        for start, block in iter_blocks(data):
+            self.extend(block)
+            if progress is not None:
+                progress((start + len(block)) / len(data))
+
+    def __len__(self):
+        return self.count
+
+    def append(self, value):
+        self.count += 1
+        # NaN marks a missing sample, it is left out of the range
+        self.minimum = np.fmin(self.minimum, value)
+        self.maximum = np.fmax(self.maximum, value)
+
+    def extend(self, values):
+        values = np.atleast_1d(np.asarray(values, dtype=float))
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        self.minimum = np.fmin(self.minimum, np.fmin.reduce(values, axis=0))
+        self.maximum = np.fmax(self.maximum, np.fmax.reduce(values, axis=0))
+
+    def limits(self, channel=0):
+        if np.ndim(self.minimum) == 0:
+            minimum, maximum = float(self.minimum), float(self.maximum)
+        else:
+            minimum, maximum = float(self.minimum[channel]), float(
+                self.maximum[channel]
+            )
+        # A channel with no valid sample yet has no range
+        if minimum > maximum:
+            return 0.0, 0.0
+        return minimum, maximum
@@ -1,22 +1,66 @@
 import csv
 import os
-import time
+from functools import partial
 
 import numpy as np
-import pandas as pd
 import pyqtgraph as pg
-import wfdb
-from PyQt5 import QtCore, QtGui, QtWidgets
+from PyQt5 import QtCore, QtGui
 from PyQt5.QtCore import QPointF, QTimer
 from PyQt5.QtWidgets import QFileDialog
+from core import (
+    AllPassRegistry,
+    ROOT_LABELS,
+    FilterDesign,
+    IncrementalResponse,
+    PhaseCascade,
+    RootRegistry,
+    SignalStats,
+    SpatialGrid,
+    StreamingFilter,
+    all_pass_phase,
+    anchor_phase,
+    load_scipy_signal,
+    open_signal,
+    read_filter_file,
+    wrap_phase,
+    write_signal,
+)
 from pyqtgraph import TargetItem
-from scipy.signal import freqz, lfilter, zpk2tf
+from realtime.clock import PlaybackClock
+from realtime.instrumentation import Instrumentation
+from realtime.renderer import RealTimeCurve
+from realtime.scheduler import ResponseUpdateScheduler
+from realtime.workers import TaskRunner, Worker
 from widgets.all_pass_library_button import AllPassProcessButton
+from widgets.stats_overlay import StatsOverlay
 
 # A folder to store the phase response plots of all-pass filters
 save_directory = "Resources/All-Pass-Phase-Responses"
 os.makedirs(save_directory, exist_ok=True)
 
+# The formats the filtered signal can be exported to, by file extension
+EXPORT_FILTERS = (
+    "CSV Files (*.csv);;NumPy Arrays (*.npy);;Raw float32 (*.f32);;"
+    "Raw float64 (*.f64);;WFDB Records (*.hea)"
+)
+
+
+def signal_task(function, argument, progress):
+    """
+    Produce a signal on a worker thread, with its stats so the UI thread
+    never has to scan it. Producing the signal reports the first half of
+    the progress and the scan the second, so both can be cancelled.
+    """
+    signal = function(argument, progress_stage(progress, 0, 0.5))
+    return signal, SignalStats(signal, progress_stage(progress, 0.5, 1))
+
+
+def progress_stage(progress, start, stop):
+    # Report the fractions done of one stage as fractions of the whole task
+    if progress is None:
+        return None
+    return lambda fraction: progress(start + (stop - start) * fraction)
+
 
 class Backend:
     def __init__(self, ui):
@@ -31,15 +75,20 @@ class Backend:
         self.ui.removeAllPoles.clicked.connect(lambda: self.remove_poles())
         self.ui.removeAllZeros.clicked.connect(lambda: self.remove_zeros())
         self.ui.resetDesign.clicked.connect(lambda: self.reset_design())
+        # Connected once: each "Remove" acts on the latest right-click only
+        self.ui.remove_action.triggered.connect(
+            lambda: self.remove_item(self.clicked_position)
+        )
 
         ## === IMPORTING === ##
         self.ui.actionImport_Signal.triggered.connect(self.import_signal)
-        self.ui.zPlane_dock_widget.csvDropped.connect(self.import_filter)
+        self.ui.zPlane_dock_widget.csvDropped.connect(self.load_filter_file)
         self.ui.importFilter.clicked.connect(self.import_filter_using_button)
 
         ## === Exporting === ##
         self.ui.exportSignal.clicked.connect(lambda: self.export_signal())
         self.ui.exportFilter.clicked.connect(lambda: self.export_filter())
+        self.ui.actionSave_Trace.triggered.connect(self.save_performance_trace)
 
         ## === CUSTOM ALL-PASS CREATION === ##
         self.ui.addAllPassFilter.clicked.connect(
@@ -91,6 +140,9 @@ class Backend:
         ## === RESET PLOTTING === ##
         self.ui.resetSignal.clicked.connect(self.reset_signal)
 
+        ## === CHANNEL SHOWN === ##
+        self.ui.channelSelector.currentIndexChanged.connect(self.select_channel)
+
         ## === CHANGE FILTRATION RATE === ##
         self.ui.filtration_slider.valueChanged.connect(
             lambda: self.update_filtration_rate()
@@ -106,25 +158,26 @@ class Backend:
         self.is_zero = True  # initially, add zeros
         self.is_pole = False
 
-        # To store poles and zeros TargetItems
-        self.poles = []
-        self.zeros = []
-        self.poles_conjugates = []
-        self.zeros_conjugates = []
+        # To store poles and zeros: their positions in compact arrays with
+        # stable ids, and the TargetItems (and conjugates) drawn for each id
+        self.poles = RootRegistry()
+        self.zeros = RootRegistry()
+        self.pole_items = {}
+        self.zero_items = {}
+        self.poles_conjugates = {}
+        self.zeros_conjugates = {}
 
-        # To store positions of poles and zeros
-        self.poles_positions = []
-        self.zeros_positions = []
-        self.poles_conjugates_positions = []
-        self.zeros_conjugates_positions = []
+        # Hit testing index over the zeros and poles, keyed by (kind, id)
+        self.root_index = SpatialGrid(cell_size=0.1)
+        self.hit_tolerance = 0.1
+        self.clicked_position = None
 
-        # For Z-Plane Filter Storing
-        self.numerator = None
-        self.denominator = None
+        # For Z-Plane Filter Storing: the Qt-free design model, an identity
+        # filter until zeros/poles are added
+        self.design = FilterDesign()
 
-        # For All-Pass zeros and poles plotting
-        self.all_pass_zeros = []
-        self.all_pass_poles = []
+        # Filters the mouse signal sample by sample, keeping its state
+        self.mouse_filter = StreamingFilter(self.design.sos)
 
         # For plotting magnitude and phase responses of Z-Plane Filter
         self.mag_curve = pg.PlotCurveItem(pen="b")
@@ -134,32 +187,65 @@ class Backend:
         self.ui.magFrequencyResponse.addItem(self.mag_curve)
         self.ui.phaseFrequencyResponse.addItem(self.phase_curve)
 
+        # Per-root factors of the response, so a dragged root is cheap to update
+        self.response_model = IncrementalResponse()
+
+        # Redraw the responses at most once per frame while dragging
+        self.response_scheduler = ResponseUpdateScheduler(self.draw_responses)
+
         # For plotting cascaded filter phase response
         self.all_pass_phase_curve = pg.PlotCurveItem(pen="orange", linewidth=5)
 
         # Add PlotCurveItem to magnitude and phase response plots
         self.ui.allPassPhaseResponse.addItem(self.all_pass_phase_curve)
 
-        # Cascaded All-Pass Transfer Function
-        self.cascaded_numerator = None
-        self.cascaded_denominator = None
+        # Phase response of the cascade, updated one member at a time
+        self.phase_cascade = PhaseCascade()
 
         # Variables for real time plotting
         self.update_interval = 50
         self.plotting_timer = QTimer()
         self.plotting_timer.timeout.connect(self.update_real_time_plots)
-        self.signal_index = 0
+        self.playback_clock = PlaybackClock()
+
+        # Timings of the hot paths, shown over the signal plots on demand
+        self.instrumentation = Instrumentation()
+        self.stats_overlay = StatsOverlay(
+            self.instrumentation, self.ui.applicationGraphs
+        )
+        self.ui.toggle_stats_action.toggled.connect(self.stats_overlay.set_shown)
+
+        # One persistent curve per signal plot, redrawn from a window buffer
+        self.original_curve = RealTimeCurve(self.ui.originalSignalPlot)
+        self.filtered_curve = RealTimeCurve(self.ui.filteredSignalPlot)
+        self.corrected_phase_curve = RealTimeCurve(self.ui.correctedPhaseSignalPlot)
 
         # Data storing variables to be plotted: initially defined
         self.original_data = []
         self.filtered_data = []
         self.corrected_phase_data = []
 
+        # Cached minimum and maximum of each signal for the plots ranges
+        self.original_stats = SignalStats()
+        self.filtered_stats = SignalStats()
+        self.corrected_phase_stats = SignalStats()
+
+        # Imports, filtering and phase correction run off the UI thread
+        self.tasks = TaskRunner()
+        self.tasks.progress.connect(self.ui.taskProgress.setValue)
+        self.tasks.busy.connect(self.show_task_progress)
+        self.ui.cancelTask.clicked.connect(self.tasks.cancel_all)
+
+        # scipy.signal takes about a second to import: it is loaded off the UI
+        # thread once the window is up, rather than by the first design
+        self.scipy_loader = Worker(load_scipy_signal)
+        QTimer.singleShot(0, lambda: self.tasks.pool.start(self.scipy_loader))
+
         # Not to reset mouse signal
         self.mouse_signal = False
 
         # All-Pass Library
-        self.user_inputs_values = []
+        self.user_inputs_values = set()
         self.idx = 10  # to accurately name the plot response of all-pass filter
         self.cascaded_filters = []  # includes the chosen filters to be cascaded
         self.all_pass_filters = [
@@ -179,6 +265,22 @@ class Backend:
                 lambda checked, button=filter: self.on_filter_chosen(checked, button)
             )
 
+        # Phases of the whole library on the cascade grid, in one batched call
+        library_phases = all_pass_phase(
+            [filter.allPassValue for filter in self.all_pass_filters],
+            self.phase_cascade.frequencies,
+        )
+        for filter, phase in zip(self.all_pass_filters, library_phases):
+            filter.phase_response = phase
+
+        # Every all-pass filter, with its plotted zero and pole while cascaded,
+        # hashed on its coefficient
+        self.all_pass_registry = AllPassRegistry()
+        for filter in self.all_pass_filters:
+            self.all_pass_registry.add(
+                filter.allPassValue, filter, filter.phase_response
+            )
+
         # Set the initial state for the library appearance
         self.organize_library(self.ui.gridLayout, self.all_pass_filters)
 
@@ -206,37 +308,23 @@ class Backend:
         if event.button() == QtCore.Qt.LeftButton:
             if self.is_pole:
                 item = self.add_target_item(pos, True, "x", "r")
-                self.store_drawn_item(
-                    pos,
-                    item,
-                    self.poles,
-                    self.poles_positions,
-                    self.poles_conjugates,
-                    self.poles_conjugates_positions,
-                )
+                root_id = self.store_drawn_item("pole", pos, item)
             elif self.is_zero:
                 item = self.add_target_item(pos, True, "o", "g")
-                self.store_drawn_item(
-                    pos,
-                    item,
-                    self.zeros,
-                    self.zeros_positions,
-                    self.zeros_conjugates,
-                    self.zeros_conjugates_positions,
-                )
+                root_id = self.store_drawn_item("zero", pos, item)
 
             if self.ui.addConjugatesCheckBox.isChecked():
                 if self.is_pole:
                     self.draw_conjugates(
-                        [self.poles_conjugates_positions[-1]], "x", "b"
+                        self.poles, self.poles_conjugates, "x", "b", [root_id]
                     )
                 elif self.is_zero:
                     self.draw_conjugates(
-                        [self.zeros_conjugates_positions[-1]], "o", "y"
+                        self.zeros, self.zeros_conjugates, "o", "y", [root_id]
                     )
 
         elif event.button() == QtCore.Qt.RightButton:
-            self.ui.remove_action.triggered.connect(lambda: self.remove_item(pos))
+            self.clicked_position = pos
             self.ui.context_menu.exec_(QtGui.QCursor.pos())
 
     # CREATING ZEROS AND POLES
@@ -250,191 +338,190 @@ class Backend:
         self.is_zero = False
         self.ui.addZero.setChecked(False)
 
-    def store_drawn_item(
-        self,
-        pos,
-        item,
-        items,
-        positions_list,
-        conjugates_list,
-        conjugates_positions_list,
-    ):
-        items.append(item)
-        positions_list.append(pos)
-        conjugates_positions_list.append(pg.Point(pos.x(), -pos.y()))
-        index = positions_list.index(pos)
+    def root_containers(self, kind):
+        # The registry, items and conjugate items of the zeros or the poles
+        if kind == "pole":
+            return self.poles, self.pole_items, self.poles_conjugates
+        return self.zeros, self.zero_items, self.zeros_conjugates
+
+    def store_drawn_item(self, kind, pos, item, update=True):
+        roots, items, _ = self.root_containers(kind)
+        root = complex(pos.x(), pos.y())
+        root_id = roots.add(root)
+        items[root_id] = item
+        self.root_index.insert((kind, root_id), root)
         # Connect the sigPositionChanged signal to the update_positions function
         item.sigPositionChanged.connect(
-            lambda: self.update_positions_on_moving(
-                item,
-                index,
-                positions_list,
-                conjugates_list,
-                conjugates_positions_list,
-            )
+            lambda: self.update_positions_on_moving(item, kind, root_id)
         )
+        item.sigPositionChangeFinished.connect(self.finish_moving)
         # Update the magnitude and phase plotting if items are being moved
-        self.update_responses()
-
-    def update_positions_on_moving(
-        self,
-        item,
-        index,
-        positions_list,
-        conjugates_list,
-        conjugates_positions_list,
-    ):
+        if update:
+            # Only the factor of the new root is added to the responses
+            self.response_model.add(root, kind == "pole")
+            self.update_changed_responses()
+        return root_id
+
+    def update_positions_on_moving(self, item, kind, root_id):
+        roots, _, conjugates = self.root_containers(kind)
         new_pos = item.pos()
-        positions_list[index] = new_pos
-        conjugates_positions_list[index] = pg.Point(new_pos.x(), -new_pos.y())
-        if bool(conjugates_list):
-            conjugates_list[index].setPos(conjugates_positions_list[index])
-
+        root = complex(new_pos.x(), new_pos.y())
+        roots.move(root_id, root)
+        self.root_index.move((kind, root_id), root)
+        if root_id in conjugates:
+            conjugates[root_id].setPos(root.real, -root.imag)
+
+        # Only the factor of the moved root changes
+        self.response_model.move(roots.slots[root_id], root, kind == "pole")
+        self.response_scheduler.request()
+
+    def finish_moving(self):
+        # Drop any merged update and draw the final position exactly
+        self.response_scheduler.cancel()
         self.update_responses()
 
     def import_filter(self, zeros, poles, allpass_zeros, allpass_poles):
         # Reset everything
         self.reset_design()
         for filter in self.cascaded_filters:
-            self.remove_all_pass_zeros_and_poles(
-                self.all_pass_zeros, filter.zero.real, filter.zero.imag
-            )
-            self.remove_all_pass_zeros_and_poles(
-                self.all_pass_poles, filter.pole.real, filter.pole.imag
-            )
+            self.remove_all_pass_zeros_and_poles(filter)
 
         # Plot the imported filters
         for zero_pos in zeros:
             item = self.add_target_item(zero_pos, True, "o", "g")
-            self.store_drawn_item(
-                zero_pos,
-                item,
-                self.zeros,
-                self.zeros_positions,
-                self.zeros_conjugates,
-                self.zeros_conjugates_positions,
-            )
+            self.store_drawn_item("zero", zero_pos, item, update=False)
         for pole_pos in poles:
             item = self.add_target_item(pole_pos, True, "x", "r")
-            self.store_drawn_item(
-                pole_pos,
-                item,
-                self.poles,
-                self.poles_positions,
-                self.poles_conjugates,
-                self.poles_conjugates_positions,
-            )
+            self.store_drawn_item("pole", pole_pos, item, update=False)
         self.handle_conjugates()
 
+        # The responses are drawn once, for all the imported zeros and poles
         self.update_responses()
 
     # PLOT MAGNITUDE AND PHASE RESPONSES
     def update_responses(self):
-        # Get poles and zeros positions
-        zeros_array = np.array([complex(z.x(), z.y()) for z in self.zeros_positions])
-        poles_array = np.array([complex(p.x(), p.y()) for p in self.poles_positions])
-
-        # Calculate magnitude and phase responses
-        self.numerator, self.denominator = zpk2tf(zeros_array, poles_array, 1)
-        frequencies_values, response_complex = freqz(self.numerator, self.denominator)
-
-        # Update magnitude response plot
-        self.mag_curve.setData(frequencies_values, 20 * np.log10(abs(response_complex)))
+        with self.instrumentation.measure("update_responses"):
+            self.update_design()
+
+            # Rebuild the responses from all the roots, read in place
+            self.response_model.reset(self.zeros.roots, self.poles.roots)
+            self.draw_responses()
+
+    def update_changed_responses(self):
+        # The response model was updated root by root, the design is rebuilt
+        with self.instrumentation.measure("update_responses"):
+            self.update_design()
+            self.draw_responses()
+
+    def update_design(self):
+        # The design model keeps the second-order sections for filtering
+        self.design.set_roots(self.zeros.roots, self.poles.roots)
+        self.mouse_filter.set_coefficients(self.design.sos)
+
+    def draw_responses(self):
+        with self.instrumentation.measure("draw_responses"):
+            frequencies_values = self.response_model.frequencies
+
+            # Update magnitude response plot
+            self.mag_curve.setData(
+                frequencies_values, self.response_model.magnitude_db()
+            )
 
-        # Update phase response plot
-        self.phase_curve.setData(frequencies_values, np.angle(response_complex))
+            # Update phase response plot
+            self.phase_curve.setData(
+                frequencies_values, wrap_phase(self.response_model.phase())
+            )
 
     # REMOVE All ZEROS/POLES AND RESET DESIGN
     def remove_poles(self):
-        self.remove(self.poles + self.poles_conjugates)
-        # Empty all pole related lists
+        self.remove([*self.pole_items.values(), *self.poles_conjugates.values()])
+        # Empty all pole related containers
+        for root_id in self.poles.ids.tolist():
+            self.root_index.remove(("pole", root_id))
         self.poles.clear()
-        self.poles_positions.clear()
+        self.pole_items.clear()
         self.poles_conjugates.clear()
-        self.poles_conjugates_positions.clear()
         self.update_responses()
 
     def remove_zeros(self):
-        self.remove(self.zeros + self.zeros_conjugates)
-        # Empty all zero related lists
+        self.remove([*self.zero_items.values(), *self.zeros_conjugates.values()])
+        # Empty all zero related containers
+        for root_id in self.zeros.ids.tolist():
+            self.root_index.remove(("zero", root_id))
         self.zeros.clear()
-        self.zeros_positions.clear()
+        self.zero_items.clear()
         self.zeros_conjugates.clear()
-        self.zeros_conjugates_positions.clear()
         self.update_responses()
 
     def reset_design(self):
         self.remove(
-            self.poles + self.poles_conjugates + self.zeros + self.zeros_conjugates,
+            [
+                *self.pole_items.values(),
+                *self.poles_conjugates.values(),
+                *self.zero_items.values(),
+                *self.zeros_conjugates.values(),
+            ]
         )
-        # Empty all lists
+        # Empty all containers
+        self.root_index.clear()
         self.poles.clear()
-        self.poles_positions.clear()
+        self.pole_items.clear()
         self.poles_conjugates.clear()
-        self.poles_conjugates_positions.clear()
         self.zeros.clear()
-        self.zeros_positions.clear()
+        self.zero_items.clear()
         self.zeros_conjugates.clear()
-        self.zeros_conjugates_positions.clear()
         self.update_responses()
 
     def remove(self, whichList):
         for item in whichList:
             self.ui.unitCirclePlot.removeItem(item)
-        self.update_responses()
 
     # REMOVE A SPECIFIC ZERO OR POLE
-    def remove_item_helper(
-        self, clicked_position, items, positions, conjugates, conjugates_positions
-    ):
-        tolerance = 0.1
-        for pos in positions:
-            if (pos - clicked_position).manhattanLength() < tolerance:
-                index = positions.index(pos)
-                item = items[index]
-                self.ui.unitCirclePlot.removeItem(item)
-                items.remove(item)
-                positions.remove(pos)
-                conjugates_positions.remove(conjugates_positions[index])
-                if self.ui.addConjugatesCheckBox.isChecked():
-                    self.ui.unitCirclePlot.removeItem(conjugates[index])
-                    conjugates.remove(conjugates[index])
-
     def remove_item(self, clicked_position):
-        self.remove_item_helper(
-            clicked_position,
-            self.poles,
-            self.poles_positions,
-            self.poles_conjugates,
-            self.poles_conjugates_positions,
-        )
-        self.remove_item_helper(
-            clicked_position,
-            self.zeros,
-            self.zeros_positions,
-            self.zeros_conjugates,
-            self.zeros_conjugates_positions,
+        # Only the zero or pole nearest to the click is removed
+        key = self.root_index.nearest(
+            complex(clicked_position.x(), clicked_position.y()), self.hit_tolerance
         )
+        if key is None:
+            return
 
-        self.update_responses()
+        kind, root_id = key
+        roots, items, conjugates = self.root_containers(kind)
+        # The response model rows follow the registry slots
+        slot = roots.slots[root_id]
+        roots.remove(root_id)
+        self.root_index.remove(key)
+        item = items.pop(root_id)
+        self.ui.unitCirclePlot.removeItem(item)
+        if root_id in conjugates:
+            self.ui.unitCirclePlot.removeItem(conjugates.pop(root_id))
+
+        # Only the factor of the removed root is taken out of the responses
+        self.response_model.remove(slot, kind == "pole")
+        self.update_changed_responses()
 
     # HANDLING CONJUGATES
     def handle_conjugates(self):
         if self.ui.addConjugatesCheckBox.isChecked():
-            self.draw_conjugates(self.poles_conjugates_positions, "x", "b")
-            self.draw_conjugates(self.zeros_conjugates_positions, "o", "y")
+            self.draw_conjugates(self.poles, self.poles_conjugates, "x", "b")
+            self.draw_conjugates(self.zeros, self.zeros_conjugates, "o", "y")
         else:
-            self.remove(self.poles_conjugates + self.zeros_conjugates)
+            self.remove(
+                [*self.poles_conjugates.values(), *self.zeros_conjugates.values()]
+            )
             self.poles_conjugates.clear()
             self.zeros_conjugates.clear()
 
-    def draw_conjugates(self, conjugates_positions, symbol, color):
-        for pos in conjugates_positions:
-            item = self.add_target_item(pos, False, symbol, color)
-            if symbol == "x":
-                self.poles_conjugates.append(item)
-            elif symbol == "o":
-                self.zeros_conjugates.append(item)
+    def draw_conjugates(self, roots, conjugates, symbol, color, root_ids=None):
+        if root_ids is None:
+            root_ids = roots.ids.tolist()
+        for root_id in root_ids:
+            if root_id in conjugates:
+                continue  # already drawn
+            root = roots.get(root_id)
+            conjugates[root_id] = self.add_target_item(
+                pg.Point(root.real, -root.imag), False, symbol, color
+            )
 
     # EXPORT THE DESIGNED FILTER
     def export_filter(self):
@@ -451,37 +538,49 @@ class Backend:
                 with open(fileName, "w", newline="") as file:
                     writer = csv.writer(file)
                     writer.writerow([None, "x", "y"])  # Write the column titles
-                    for zero in self.zeros_positions:
-                        writer.writerow(["zero", zero.x(), zero.y()])
+                    for zero in self.zeros.roots.tolist():
+                        writer.writerow(["zero", zero.real, zero.imag])
                     writer.writerow([])
-                    for pole in self.poles_positions:
-                        writer.writerow(["pole", pole.x(), pole.y()])
+                    for pole in self.poles.roots.tolist():
+                        writer.writerow(["pole", pole.real, pole.imag])
                     writer.writerow([])
-                    for allpass_zero in self.all_pass_zeros:
-                        writer.writerow(
-                            [
-                                "allpass zero",
-                                allpass_zero.pos().x(),
-                                allpass_zero.pos().y(),
-                            ]
-                        )
+                    plotted = self.plotted_all_pass_filters()
+                    for entry in plotted:
+                        zero = entry.zero_item.pos()
+                        writer.writerow(["allpass zero", zero.x(), zero.y()])
                     writer.writerow([])
-                    for allpass_pole in self.all_pass_poles:
-                        writer.writerow(
-                            [
-                                "allpass pole",
-                                allpass_pole.pos().x(),
-                                allpass_pole.pos().y(),
-                            ]
-                        )
+                    for entry in plotted:
+                        pole = entry.pole_item.pos()
+                        writer.writerow(["allpass pole", pole.x(), pole.y()])
+
+    # SAVE THE TIMINGS OF THE HOT PATHS
+    def save_performance_trace(self):
+        fileName, _ = QFileDialog.getSaveFileName(
+            None, "Save File", "", "JSON Files (*.json);;CSV Files (*.csv)"
+        )
+        if fileName:
+            try:
+                self.instrumentation.save_trace(fileName)
+            except OSError as e:
+                print(f"Error saving the file: {e}")
 
     # EXPORT THE FILTERED SIGNAL
     def export_signal(self):
-        fileName, _ = QFileDialog.getSaveFileName(
-            None, "Save File", "", "CSV Files (*.csv)"
+        fileName, selected_filter = QFileDialog.getSaveFileName(
+            None, "Save File", "", EXPORT_FILTERS
         )
         if fileName:
-            np.savetxt(fileName, self.filtered_data, delimiter=",")
+            # Names without an extension get the one of the chosen format
+            if not os.path.splitext(fileName)[1]:
+                fileName += selected_filter.split("*")[-1].rstrip(")")
+            # WFDB records keep the sampling frequency and units of the import
+            self.tasks.start(
+                "export",
+                partial(write_signal, source=self.original_data),
+                fileName,
+                self.filtered_data,
+                on_failed=lambda message: print(f"Error saving the file: {message}"),
+            )
 
     # ORGANIZING ALL-PASS lIBRARY
     def organize_library(self, scrollAreaLayout, filtersList):
@@ -494,6 +593,7 @@ class Backend:
             if button in self.all_pass_filters:
                 self.all_pass_filters.remove(button)
                 self.cascaded_filters.append(button)
+                self.phase_cascade.add(button, self.all_pass_phase(button))
                 self.add_all_pass_zeros_and_poles(button)
                 self.update_cascaded_phase_response()
                 self.update_z_plane_view()
@@ -502,12 +602,8 @@ class Backend:
             if button in self.cascaded_filters:
                 self.cascaded_filters.remove(button)
                 self.all_pass_filters.append(button)
-                self.remove_all_pass_zeros_and_poles(
-                    self.all_pass_zeros, button.zero.real, button.zero.imag
-                )
-                self.remove_all_pass_zeros_and_poles(
-                    self.all_pass_poles, button.pole.real, button.pole.imag
-                )
+                self.phase_cascade.remove(button)
+                self.remove_all_pass_zeros_and_poles(button)
                 self.update_cascaded_phase_response()
                 self.update_z_plane_view()
 
@@ -531,7 +627,7 @@ class Backend:
         # Get the value entered in the text field
         value = self.ui.gainInput.text()
         if not self.validate_a_value():
-            self.user_inputs_values.append(value)
+            self.user_inputs_values.add(value)
             self.ui.gainInput.clear()
 
             # Instantiate a library button
@@ -543,8 +639,10 @@ class Backend:
             # Set the button name
             button.setObjectName(button_name)
 
-            # Add the button to the cascaded filters
+            # Add the button to the registry and the cascaded filters
+            self.all_pass_registry.add(value, button, button.get_phase_response())
             self.cascaded_filters.append(button)
+            self.phase_cascade.add(button, self.all_pass_phase(button))
             self.add_all_pass_zeros_and_poles(button)
             self.update_cascaded_phase_response()
 
@@ -581,41 +679,51 @@ class Backend:
         elif value == "1":
             self.show_error(self.ui.value_error, "'a' can't be 1", self.ui.gainInput)
             return True
-        else:
-            for filter in self.all_pass_filters + self.cascaded_filters:
-                if complex(value) == complex(filter.allPassValue):
-                    self.show_error(
-                        self.ui.value_error,
-                        "Filter already exists",
-                        self.ui.gainInput,
-                    )
-                    return True
+        elif value in self.all_pass_registry:
+            self.show_error(
+                self.ui.value_error,
+                "Filter already exists",
+                self.ui.gainInput,
+            )
+            return True
 
         # If no duplicate is found, clear the error message and reset the border
         self.hide_error(self.ui.value_error)
         return False
 
+    def all_pass_phase(self, button):
+        # The phase response cached with the filter in the registry
+        return self.all_pass_registry.find(button.allPassValue).phase
+
     def add_all_pass_zeros_and_poles(self, button):
-        zero_item = self.add_target_item(
+        entry = self.all_pass_registry.find(button.allPassValue)
+        entry.zero_item = self.add_target_item(
             (button.zero.real, button.zero.imag), False, "o", "orange"
         )
-        pole_item = self.add_target_item(
+        entry.pole_item = self.add_target_item(
             (button.pole.real, button.pole.imag), False, "x", "orange"
         )
-        self.all_pass_zeros.append(zero_item)
-        self.all_pass_poles.append(pole_item)
 
-    def remove_all_pass_zeros_and_poles(self, items, real, imag):
-        for item in items:
-            if item.pos() == QPointF(real, imag):
+    def remove_all_pass_zeros_and_poles(self, button):
+        entry = self.all_pass_registry.find(button.allPassValue)
+        for item in (entry.zero_item, entry.pole_item):
+            if item is not None:
                 self.ui.unitCirclePlot.removeItem(item)
-                items.remove(item)
+        entry.zero_item = entry.pole_item = None
+
+    def plotted_all_pass_filters(self):
+        # Registry entries of the cascaded filters whose zero and pole are shown
+        entries = (
+            self.all_pass_registry.find(filter.allPassValue)
+            for filter in self.cascaded_filters
+        )
+        return [entry for entry in entries if entry.zero_item is not None]
 
     def update_z_plane_view(self):
         max_value = 1.1
-        for item in self.all_pass_zeros + self.all_pass_poles:
-            max_value = max(max_value, item.pos().x())
-            max_value = max(max_value, item.pos().y())
+        for entry in self.plotted_all_pass_filters():
+            for item in (entry.zero_item, entry.pole_item):
+                max_value = max(max_value, item.pos().x(), item.pos().y())
 
         max_value += 0.2  # to make the plane visually appealing
         self.ui.unitCirclePlot.setRange(
@@ -626,22 +734,9 @@ class Backend:
         )
 
     def update_cascaded_phase_response(self):
-        self.cascaded_numerator = np.array([1.0])
-        self.cascaded_denominator = np.array([1.0])
-        for filter in self.cascaded_filters:
-            numerator, denominator = filter.get_transfer_function()
-            self.cascaded_numerator, self.cascaded_denominator = np.convolve(
-                self.cascaded_numerator, numerator
-            ), np.convolve(self.cascaded_denominator, denominator)
-
         # Plot the phase response of the cascaded filter
-        cascade_frequencies, cascade_response = freqz(
-            self.cascaded_numerator, self.cascaded_denominator, worN=8000
-        )
-
         self.all_pass_phase_curve.setData(
-            cascade_frequencies,
-            np.unwrap(np.angle(cascade_response)),
+            self.phase_cascade.frequencies, self.phase_cascade.phase()
         )
 
     def correct_phase(self):
@@ -655,23 +750,43 @@ class Backend:
             return
         else:
             self.hide_error(self.ui.filterNotChosen)
-            corrected_numerator, corrected_denominator = np.convolve(
-                self.cascaded_numerator, self.numerator
-            ), np.convolve(self.cascaded_denominator, self.denominator)
-            corrected_frequencies, corrected_response = freqz(
-                corrected_numerator, corrected_denominator, worN=8000
+            # The design phase adds up with the phase of the cascade
+            corrected_phase = (
+                self.design.unwrapped_phase(len(self.phase_cascade.frequencies))
+                + self.phase_cascade.total
             )
             self.phase_curve.setData(
-                corrected_frequencies,
-                np.unwrap(np.angle(corrected_response)),
+                self.phase_cascade.frequencies, anchor_phase(corrected_phase)
             )
 
-            self.corrected_phase_data = lfilter(
-                self.cascaded_numerator, self.cascaded_denominator, self.filtered_data
-            ).real
+            self.design.set_all_pass(
+                [complex(filter.allPassValue) for filter in self.cascaded_filters]
+            )
+            self.start_phase_correction()
+
+    def start_phase_correction(self):
+        self.tasks.start(
+            "correct phase",
+            signal_task,
+            self.design.correct_phase,
+            self.filtered_data,
+            on_finished=partial(self.on_phase_corrected, self.filtered_data),
+            on_failed=self.on_task_failed,
+        )
 
-            self.corrected_phase_data *= -1
-            self.update_real_time_plots()
+    def clear_corrected_phase(self):
+        # The corrected signal of the previous signal, which may have had
+        # other channels
+        self.corrected_phase_data = []
+        self.corrected_phase_stats = SignalStats()
+        self.corrected_phase_curve.clear()
+
+    def on_phase_corrected(self, filtered_data, result):
+        if filtered_data is not self.filtered_data:
+            # Corrected from an output that was replaced since
+            return
+        self.corrected_phase_data, self.corrected_phase_stats = result
+        self.draw_real_time_plots()
 
     # VALIDATING INPUT & ERROR MESSAGES
     def show_error(self, error_label, message, widget):
@@ -696,34 +811,21 @@ class Backend:
         )
 
         if file_path:
-            try:
-                zero_tuples = []
-                pole_tuples = []
-                allpass_zero_tuples = []
-                allpass_pole_tuples = []
-                with open(file_path, "r") as file:
-                    reader = csv.reader(file)
-                    next(reader)
-                    # Extract the zeros and poles
-                    for row in reader:
-                        if len(row) != 0:
-                            x = float(row[1])
-                            y = float(row[2])
-                            if row[0] == "zero":
-                                zero_tuples.append(QtCore.QPointF(x, y))
-                            elif row[0] == "pole":
-                                pole_tuples.append(QtCore.QPointF(x, y))
-                            elif row[0] == "allpass zero":
-                                allpass_zero_tuples.append(QtCore.QPointF(x, y))
-                            elif row[0] == "allpass pole":
-                                allpass_pole_tuples.append(QtCore.QPointF(x, y))
-                        else:
-                            pass
-                self.import_filter(
-                    zero_tuples, pole_tuples, allpass_zero_tuples, allpass_pole_tuples
-                )
-            except Exception as e:
-                print(f"Error loading the file: {e}")
+            self.load_filter_file(file_path)
+
+    def load_filter_file(self, file_path):
+        # Shared by the import button and the files dropped on the Z-plane
+        try:
+            roots = read_filter_file(file_path)
+        except (OSError, ValueError) as e:
+            print(f"Error loading the file: {e}")
+            return
+        self.import_filter(
+            *(
+                [QPointF(root.real, root.imag) for root in roots[label]]
+                for label in ROOT_LABELS
+            )
+        )
 
     # APPLICATION SIGNALS Importing & PLOTTING
     def import_signal(self):
@@ -732,67 +834,119 @@ class Backend:
             None,
             "Open Signal Files",
             "",
-            "Signal Files (*.csv *.hea *.dat);;All Files (*)",
+            "Signal Files (*.csv *.hea *.dat *.npy);;All Files (*)",
             options=options,
         )
 
         if file_path:
-            try:
-                if file_path.endswith(".hea") or file_path.endswith(".dat"):
-                    # Read signal data from .hea and .dat files using wfdb library
-                    record = wfdb.rdrecord(file_path[:-4])  # Remove ".hea" extension
-                    self.original_data = record.p_signal[:, 0]  # Use the first channel
-                    self.filtered_data = self.original_data
-
-                elif file_path.endswith(".csv"):
-                    # Use pandas to read the CSV file
-                    data_frame = pd.read_csv(file_path)
-                    # Use the first column as the signal data
-                    self.original_data = data_frame.iloc[:, 0].to_numpy()
-                    self.filtered_data = self.original_data
-                else:
-                    pass
-
-                # Reset the signal index when a new signal is imported
-                self.signal_index = 0
-                self.update_real_time_plots()  # Use the new signal data for real-time plotting
-                self.plotting_timer.start(self.update_interval)
-            except Exception as e:
-                print(f"Error loading the file: {e}")
+            # Results computed for the previous signal are of no use anymore
+            self.cancel_signal_tasks()
+            self.tasks.start(
+                "import",
+                signal_task,
+                open_signal,
+                file_path,
+                on_finished=self.on_signal_imported,
+                on_failed=lambda message: print(f"Error loading the file: {message}"),
+            )
+
+    def on_signal_imported(self, result):
+        # Tasks started while the import ran still work on the previous signal
+        self.cancel_signal_tasks()
+        self.original_data, self.original_stats = result
+        self.filtered_data = self.original_data
+        self.filtered_stats = self.original_stats
+        self.clear_corrected_phase()
+
+        # Reset the playback when a new signal is imported, before the channel
+        # selector redraws the plots at the old position
+        self.playback_clock.reset()
+        self.update_channel_selector(self.original_data)
+        self.update_real_time_plots()  # Use the new signal data for real-time plotting
+        self.start_plotting_timer()
+
+    # BACKGROUND TASKS
+    def cancel_signal_tasks(self):
+        # The tasks that work on the current signal, not on a file
+        self.tasks.cancel("filter")
+        self.tasks.cancel("correct phase")
+
+    def show_task_progress(self, busy):
+        self.ui.taskProgress.setVisible(busy)
+        self.ui.cancelTask.setVisible(busy)
+
+    def on_task_failed(self, message):
+        print(f"Error processing the signal: {message}")
+
+    def start_plotting_timer(self):
+        self.plotting_timer.start(self.update_interval)
+        self.instrumentation.start_frames(self.update_interval)
 
     def update_real_time_plots(self):
-        self.update_plot(self.ui.originalSignalPlot, self.original_data)
-        self.update_plot(self.ui.filteredSignalPlot, self.filtered_data)
+        # Advance once per frame by the chosen number of points, for all plots
+        position = self.playback_clock.position
+        self.playback_clock.advance(
+            self.ui.filtration_slider.value(), len(self.original_data)
+        )
+        with self.instrumentation.frame(self.playback_clock.position - position):
+            self.draw_real_time_plots()
+        self.instrumentation.measure_until_idle("paint")
+
+    def draw_real_time_plots(self):
+        self.update_plot(self.original_curve, self.original_data, self.original_stats)
+        self.update_plot(self.filtered_curve, self.filtered_data, self.filtered_stats)
         if self.ui.correctPhase.isChecked():
             self.update_plot(
-                self.ui.correctedPhaseSignalPlot, self.corrected_phase_data
+                self.corrected_phase_curve,
+                self.corrected_phase_data,
+                self.corrected_phase_stats,
             )
         else:
-            self.ui.correctedPhaseSignalPlot.clear()
+            self.corrected_phase_curve.clear()
 
-    def update_plot(self, plot_widget, signal_data):
-        plot_widget.clear()
-        self.signal_index += (
-            self.ui.filtration_slider.value()
-        )  # Increment by the value of the slider
-        if self.signal_index >= len(signal_data):
-            self.signal_index = len(signal_data)
+    def update_plot(self, curve, signal_data, stats):
+        with self.instrumentation.measure("update_plot"):
+            plot_widget = curve.plot_widget
+            signal_index = min(self.playback_clock.position, len(signal_data))
 
-        x_data = np.arange(self.signal_index)
-        y_data = signal_data[: self.signal_index]
-        y_max = max(signal_data)
-        y_min = min(signal_data)
+            curve.update(signal_data, signal_index)
+            if len(stats) == 0:
+                return
+            y_min, y_max = stats.limits(curve.channel)
 
-        plot_widget.plot(x=x_data, y=y_data, pen="orange")
-        plot_widget.setYRange(y_min, y_max, padding=0.1)
+            plot_widget.setYRange(y_min, y_max, padding=0.1)
 
-        visible_range = (self.signal_index - 150, self.signal_index + 150)
-        x_min_limit, x_max_limit = 0, self.signal_index + 0.1
+            visible_range = (signal_index - 150, signal_index + 150)
+            x_min_limit, x_max_limit = 0, signal_index + 0.1
 
-        plot_widget.setLimits(
-            xMin=x_min_limit, xMax=x_max_limit, yMin=y_min, yMax=y_max
-        )
-        plot_widget.setXRange(*visible_range, padding=0)
+            plot_widget.setLimits(
+                xMin=x_min_limit, xMax=x_max_limit, yMin=y_min, yMax=y_max
+            )
+            plot_widget.setXRange(*visible_range, padding=0)
+
+    def update_channel_selector(self, signal_data):
+        # One entry per channel, named after the record's channels if it has names
+        channels = np.shape(signal_data)[1] if np.ndim(signal_data) == 2 else 1
+        names = getattr(signal_data, "channel_names", None) or [
+            f"Channel {channel + 1}" for channel in range(channels)
+        ]
+        self.ui.channelSelector.blockSignals(True)
+        self.ui.channelSelector.clear()
+        self.ui.channelSelector.addItems(names[:channels])
+        self.ui.channelSelector.blockSignals(False)
+        self.ui.channelSelector.setEnabled(channels > 1)
+        self.select_channel(0)
+
+    def select_channel(self, channel):
+        if channel < 0:
+            return
+        for curve in (
+            self.original_curve,
+            self.filtered_curve,
+            self.corrected_phase_curve,
+        ):
+            curve.set_channel(channel)
+        self.draw_real_time_plots()
 
     def update_filtration_rate(self):
         points_value = self.ui.filtration_slider.value()
@@ -805,19 +959,19 @@ class Backend:
                 QtGui.QIcon("Resources/Icons/play_button.png")
             )
         else:
-            self.plotting_timer.start(self.update_interval)
+            self.start_plotting_timer()
             self.ui.pause_play_button.setIcon(
                 QtGui.QIcon("Resources/Icons/pause_button.png")
             )
 
     def reset_signal(self):
         self.plotting_timer.stop()
-        self.ui.originalSignalPlot.clear()
-        self.ui.filteredSignalPlot.clear()
-        self.signal_index = 0
+        self.original_curve.clear()
+        self.filtered_curve.clear()
+        self.playback_clock.reset()
         self.slicing_idx = 0
         self.ui.pause_play_button.setChecked(False)
-        self.plotting_timer.start(self.update_interval)
+        self.start_plotting_timer()
 
     def apply_filter(self):
         if len(self.poles) == 0 and len(self.zeros) == 0:
@@ -826,60 +980,63 @@ class Backend:
             )
             return
 
-        # Reset the plotting and filtered_data
-        if not self.ui.generateSignal.isChecked():
-            self.signal_index = 0
-        self.filtered_data = np.zeros_like(self.original_data)
-        update_frequency = 10
-
-        # Apply the filter difference equation and update the plot in real-time
-        for n in range(len(self.original_data)):
-            if not self.ui.pause_play_button.isChecked():
-                x_n = self.original_data[n]
-                y_n = 0
-
-                # Compute the x terms
-                for k in range(len(self.numerator)):
-                    if n - k >= 0:
-                        y_n += self.numerator[k] * x_n
-
-                # Compute the y terms
-                for k in range(1, len(self.denominator)):
-                    if n - k >= 0:
-                        y_n -= self.denominator[k] * self.filtered_data[n - k]
-
-                # Compute the total output
-                y_n_real = y_n.real  # or np.real(y_n)
-                self.filtered_data[n] = y_n_real
-
-                # Update the plots every N iterations
-                if n % update_frequency == 0:
-                    self.update_real_time_plots()
-                    QtWidgets.QApplication.processEvents()
-
-                # Optionally, add a small delay for better visualization (not necessary)
-                time.sleep(0.01)
-            else:
-                n = n - 1
+        if self.ui.generateSignal.isChecked():
+            # Refilter the mouse history and carry its state to the next samples
+            self.mouse_filter.reset()
+            self.filtered_data = list(self.mouse_filter.process(self.original_data))
+            self.filtered_stats = SignalStats(self.filtered_data)
+            self.draw_real_time_plots()
+        else:
+            # Compute the whole output at once, the real-time plots only reveal it
+            self.tasks.cancel("correct phase")
+            self.tasks.start(
+                "filter",
+                signal_task,
+                self.design.filter,
+                self.original_data,
+                on_finished=self.on_signal_filtered,
+                on_failed=self.on_task_failed,
+            )
 
+    def on_signal_filtered(self, result):
+        self.filtered_data, self.filtered_stats = result
+        if self.ui.correctPhase.isChecked() and self.cascaded_filters:
+            # The corrected signal derives from the output that just changed
+            self.start_phase_correction()
+        # Replay the signals from the start
+        self.playback_clock.reset()
         if self.ui.pause_play_button.isChecked():
-            self.ui.pause_play_button.setChecked(False)
+            self.ui.pause_play_button.setChecked(False)  # resumes the timer
+        else:
+            self.start_plotting_timer()
+        self.update_real_time_plots()
 
     # GENERATE SIGNAL BY MOUSE MOVEMENT
     def start_generating(self, checked):
         if checked:
             self.plotting_timer.stop()
-            self.ui.originalSignalPlot.clear()
-            self.ui.filteredSignalPlot.clear()
+            self.cancel_signal_tasks()
+            self.original_curve.clear()
+            self.filtered_curve.clear()
             self.original_data = []
             self.filtered_data = []
+            self.original_stats = SignalStats()
+            self.filtered_stats = SignalStats()
+            self.clear_corrected_phase()
+            self.mouse_filter.reset()
+            self.update_channel_selector(self.original_data)
             self.ui.mousePad.dataPoint.connect(self.capture_mouse_signal)
         else:
             self.ui.mousePad.dataPoint.disconnect(self.capture_mouse_signal)
 
     def capture_mouse_signal(self, y):
         self.original_data.append(y)
-        self.filtered_data = lfilter(
-            self.numerator, self.denominator, self.original_data
-        ).real
-        self.update_real_time_plots()
+        self.original_stats.append(y)
+        # Only the new sample is filtered, the filter state carries the history
+        with self.instrumentation.measure("mouse_filter", 1):
+            filtered_samples = self.mouse_filter.process(y)
+        self.filtered_data.extend(filtered_samples)
+        self.filtered_stats.extend(filtered_samples)
+        # The mouse signal is always shown up to its newest sample
+        self.playback_clock.seek(len(self.original_data))
+        self.draw_real_time_plots()
@@ -1,7 +1,11 @@
-import csv
-import webbrowser
+import argparse
+import os
+import sys
+import time
+
+# Startup is profiled from here, before the Qt and pyqtgraph imports below
+STARTUP = time.perf_counter()
 
-import icons as icons
 import pyqtgraph as pg
 from filterDesignBackend import Backend
 from PyQt5 import QtCore, QtGui, QtWidgets
@@ -17,13 +21,8 @@ class Ui_FilterDesigner(object):
     def setupUi(self, FilterDesigner):
         FilterDesigner.setObjectName("FilterDesigner")
         FilterDesigner.resize(1280, 720)
-        icon = QtGui.QIcon()
-        icon.addPixmap(
-            QtGui.QPixmap(":/appIcon/processing.png"),
-            QtGui.QIcon.Normal,
-            QtGui.QIcon.Off,
-        )
-        FilterDesigner.setWindowIcon(icon)
+        # The icons resource is registered once the window is up
+        QtCore.QTimer.singleShot(0, lambda: self.load_window_icon(FilterDesigner))
         self.centralwidget = QtWidgets.QWidget(FilterDesigner)
         self.centralwidget.setObjectName("centralwidget")
         self.verticalLayout_9 = QtWidgets.QVBoxLayout(self.centralwidget)
@@ -128,6 +127,17 @@ class Ui_FilterDesigner(object):
         self.statusbar = QtWidgets.QStatusBar(FilterDesigner)
         self.statusbar.setObjectName("statusbar")
         FilterDesigner.setStatusBar(self.statusbar)
+        # Progress of the background imports and filtering, hidden when idle
+        self.taskProgress = QtWidgets.QProgressBar(self.statusbar)
+        self.taskProgress.setRange(0, 100)
+        self.taskProgress.setMaximumWidth(200)
+        self.taskProgress.setObjectName("taskProgress")
+        self.taskProgress.setVisible(False)
+        self.statusbar.addPermanentWidget(self.taskProgress)
+        self.cancelTask = QtWidgets.QPushButton(self.statusbar)
+        self.cancelTask.setObjectName("cancelTask")
+        self.cancelTask.setVisible(False)
+        self.statusbar.addPermanentWidget(self.cancelTask)
         self.allPassLibrary = QtWidgets.QDockWidget(FilterDesigner)
         self.allPassLibrary.setMinimumSize(QtCore.QSize(437, 413))
         self.allPassLibrary.setObjectName("allPassLibrary")
@@ -411,7 +421,10 @@ class Ui_FilterDesigner(object):
         self.actionExit.setObjectName("actionExit")
         self.actionExit.setShortcut("Ctrl+Q")
         self.actionExit.triggered.connect(self.exitApplication)
+        self.actionSave_Trace = QtWidgets.QAction(FilterDesigner)
+        self.actionSave_Trace.setObjectName("actionSave_Trace")
         self.menuFile.addAction(self.actionImport_Signal)
+        self.menuFile.addAction(self.actionSave_Trace)
         self.menuFile.addAction(self.actionExit)
         self.menubar.addAction(self.menuFile.menuAction())
         self.menubar.addAction(self.menuView.menuAction())
@@ -444,6 +457,12 @@ class Ui_FilterDesigner(object):
         )
         self.menuView.addAction(self.toggle_dock3_action)
 
+        # Timings of the real-time plotting, drawn over the signal plots
+        self.menuView.addSeparator()
+        self.toggle_stats_action = QAction("Performance Stats", FilterDesigner)
+        self.toggle_stats_action.setCheckable(True)
+        self.menuView.addAction(self.toggle_stats_action)
+
         self.zPlane_dock_widget.visibilityChanged.connect(self.toggleZPlaneButton)
         self.allPassLibrary.visibilityChanged.connect(self.toggleAllpassButton)
 
@@ -523,6 +542,12 @@ class Ui_FilterDesigner(object):
         self.resetSignal = QtWidgets.QPushButton()
         self.resetSignal.setObjectName("resetSignal")
         self.resetSignal.setIcon(QtGui.QIcon("Resources/Icons/reset.png"))
+        # The channel shown for multi-channel records
+        self.channelSelector = QtWidgets.QComboBox()
+        self.channelSelector.setObjectName("channelSelector")
+        self.channelSelector.setMinimumWidth(100)
+        self.channelSelector.addItem("Channel 1")
+        self.channelSelector.setEnabled(False)
         spacerItem4 = QtWidgets.QSpacerItem(
             40, 20, QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Minimum
         )
@@ -559,6 +584,7 @@ class Ui_FilterDesigner(object):
         self.speedHLayout.addWidget(self.resetSignal)
         self.speedHLayout.addLayout(self.speedControllerVerticalLayout)
         self.speedHLayout.addItem(spacerItem5)
+        self.speedHLayout.addWidget(self.channelSelector)
         self.speedHLayout.addWidget(self.exportSignal)
         self.verticalLayout_7.addLayout(self.speedHLayout)
 
@@ -603,10 +629,23 @@ class Ui_FilterDesigner(object):
         else:
             dock.show()
 
+    def load_window_icon(self, FilterDesigner):
+        import icons  # registers the ":/" resources
+
+        icon = QtGui.QIcon()
+        icon.addPixmap(
+            QtGui.QPixmap(":/appIcon/processing.png"),
+            QtGui.QIcon.Normal,
+            QtGui.QIcon.Off,
+        )
+        FilterDesigner.setWindowIcon(icon)
+
     def exitApplication(self):
         sys.exit()
 
     def open_documentation(self):
+        import webbrowser
+
         webbrowser.open("https://github.com/Team-19-DSP-Tasks/Task06-FilterDesign")
 
     def retranslateUi(self, FilterDesigner):
@@ -626,6 +665,7 @@ class Ui_FilterDesigner(object):
             _translate("FilterDesigner", "Remove all cascaded filters")
         )
         self.generateSignal.setText(_translate("FilterDesigner", "Generate Signal"))
+        self.cancelTask.setText(_translate("FilterDesigner", "Cancel"))
         self.menuFile.setTitle(_translate("FilterDesigner", "File"))
         self.menuHelp.setTitle(_translate("FilterDesigner", "Help"))
         self.menuTools.setTitle(_translate("FilterDesigner", "Tools"))
@@ -666,19 +706,56 @@ class Ui_FilterDesigner(object):
             _translate("FilterDesigner", "Frequency Response")
         )
         self.actionImport_Signal.setText(_translate("FilterDesigner", "Import Signal"))
+        self.actionSave_Trace.setText(
+            _translate("FilterDesigner", "Save Performance Trace")
+        )
         self.actionExit.setText(_translate("FilterDesigner", "Exit"))
 
 
-if __name__ == "__main__":
-    import sys
-
-    app = QtWidgets.QApplication(sys.argv)
-    with open("Filter\stylesheet.qss", "r") as f:
+# Loaded on first use, a startup profile lists any that were loaded before
+LAZY_MODULES = ("pandas", "wfdb", "matplotlib", "scipy.signal")
+
+
+def report_startup(marks):
+    print("Startup profile:")
+    previous = STARTUP
+    for name, mark in marks + [("first window", time.perf_counter())]:
+        print(f"  {name:<14}{mark - previous:8.3f} s")
+        previous = mark
+    print(f"  {'total':<14}{previous - STARTUP:8.3f} s")
+    loaded = [name for name in LAZY_MODULES if name in sys.modules]
+    print(f"  loaded early: {', '.join(loaded) or 'none'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Design and apply digital filters.")
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="print the time taken until the first window is shown",
+    )
+    # The remaining arguments are left to Qt
+    args, qt_args = parser.parse_known_args()
+
+    marks = [("imports", time.perf_counter())]
+    app = QtWidgets.QApplication(sys.argv[:1] + qt_args)
+    if args.profile_startup:
+        # Runs once the event loop starts, after the window is shown and
+        # before the deferred loading (the window icon) begins
+        QtCore.QTimer.singleShot(0, lambda: report_startup(marks))
+    stylesheet_path = os.path.join(os.path.dirname(__file__), "stylesheet.qss")
+    with open(stylesheet_path, "r") as f:
         stylesheet = f.read()
         app.setStyleSheet(stylesheet)
     FilterDesigner = QtWidgets.QMainWindow()
     ui = Ui_FilterDesigner()
     ui.setupUi(FilterDesigner)
+    marks.append(("window setup", time.perf_counter()))
     backend = Backend(ui)
+    marks.append(("backend", time.perf_counter()))
     FilterDesigner.show()
     sys.exit(app.exec_())
+
+
+if __name__ == "__main__":
+    main()
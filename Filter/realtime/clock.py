@@ -0,0 +1,18 @@
+class PlaybackClock:
+    """
+    The playback position shared by all the real-time plots. It is advanced
+    once per frame, so every plot shows the same prefix of its signal.
+    """
+
+    def __init__(self):
+        self.position = 0
+
+    def advance(self, step, length):
+        self.position = min(self.position + step, length)
+        return self.position
+
+    def seek(self, position):
+        self.position = position
+
+    def reset(self):
+        self.position = 0
@@ -0,0 +1,148 @@
+import csv
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+from PyQt5.QtCore import QTimer
+
+# Bin edges of the frame duration histogram, in milliseconds
+FRAME_BINS_MS = (0, 5, 10, 20, 33, 50, 100, np.inf)
+
+
+class Instrumentation:
+    """
+    Timings of the hot paths and of the real-time plotting frames. Each
+    timer keeps its latest durations in a rolling window for the live stats,
+    and every measurement is also appended to a bounded trace that can be
+    saved as JSON or CSV for offline analysis.
+    """
+
+    def __init__(self, window=500, trace_length=100_000):
+        self.window = window
+        self.started = time.perf_counter()
+        self.timings = {}  # timer name -> deque of the latest durations, in s
+        self.trace = deque(maxlen=trace_length)  # (time, name, duration, samples)
+
+        # Frames of the plotting timer
+        self.frame_interval = None
+        self.last_frame = None
+        self.frame_gaps = deque(maxlen=window)  # time between consecutive frames
+        self.frame_samples = deque(maxlen=window)  # samples shown by each frame
+        self.frames = 0
+        self.missed_deadlines = 0
+
+    def record(self, name, duration, samples=0):
+        if name not in self.timings:
+            self.timings[name] = deque(maxlen=self.window)
+        self.timings[name].append(duration)
+        self.trace.append(
+            (time.perf_counter() - self.started - duration, name, duration, samples)
+        )
+
+    @contextmanager
+    def measure(self, name, samples=0):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start, samples)
+
+    def start_frames(self, interval):
+        # The plotting timer (re)started: the pause before it is not a delay
+        self.frame_interval = interval / 1000
+        self.last_frame = None
+
+    @contextmanager
+    def frame(self, samples):
+        """
+        Time one tick of the plotting timer, and count the ticks it came too
+        late for: a frame one interval later than due missed one deadline.
+        """
+        now = time.perf_counter()
+        if self.last_frame is not None and self.frame_interval:
+            gap = now - self.last_frame
+            self.frame_gaps.append(gap)
+            self.frame_samples.append(samples)
+            self.missed_deadlines += max(0, round(gap / self.frame_interval) - 1)
+        self.last_frame = now
+        self.frames += 1
+        with self.measure("frame", samples):
+            yield
+
+    def measure_until_idle(self, name):
+        # Time until the event loop is free again, mostly the repaint of what
+        # the caller changed
+        start = time.perf_counter()
+        QTimer.singleShot(0, lambda: self.record(name, time.perf_counter() - start))
+
+    def durations(self, name):
+        return np.array(self.timings.get(name, ()))
+
+    def frame_histogram(self):
+        # Frame durations of the window per bin of FRAME_BINS_MS
+        counts, _ = np.histogram(1000 * self.durations("frame"), FRAME_BINS_MS)
+        return counts
+
+    def throughput(self):
+        # Samples played per second over the window
+        elapsed = sum(self.frame_gaps)
+        return sum(self.frame_samples) / elapsed if elapsed else 0.0
+
+    def summary(self):
+        timers = {}
+        for name in self.timings:
+            durations = 1000 * self.durations(name)
+            timers[name] = {
+                "count": len(durations),
+                "mean_ms": float(durations.mean()),
+                "p95_ms": float(np.percentile(durations, 95)),
+                "max_ms": float(durations.max()),
+            }
+        return {
+            "timers": timers,
+            "frames": self.frames,
+            "missed_deadlines": self.missed_deadlines,
+            "frame_interval_ms": (
+                1000 * self.frame_interval if self.frame_interval else None
+            ),
+            "frame_histogram": {
+                (f"{low}-{high} ms" if high < np.inf else f"{low}+ ms"): int(count)
+                for low, high, count in zip(
+                    FRAME_BINS_MS[:-1], FRAME_BINS_MS[1:], self.frame_histogram()
+                )
+            },
+            "samples_per_second": self.throughput(),
+        }
+
+    def save_trace(self, file_path):
+        """
+        Write the trace to a .csv file (time, name, duration and samples of
+        every measurement) or, for any other extension, to JSON along with
+        the summary of the latest window.
+        """
+        if file_path.lower().endswith(".csv"):
+            with open(file_path, "w", newline="") as file:
+                writer = csv.writer(file)
+                writer.writerow(["time_s", "name", "duration_ms", "samples"])
+                for start, name, duration, samples in self.trace:
+                    writer.writerow([f"{start:.6f}", name, 1000 * duration, samples])
+        else:
+            with open(file_path, "w") as file:
+                json.dump(
+                    {
+                        "summary": self.summary(),
+                        "trace": [
+                            {
+                                "time_s": start,
+                                "name": name,
+                                "duration_ms": 1000 * duration,
+                                "samples": samples,
+                            }
+                            for start, name, duration, samples in self.trace
+                        ],
+                    },
+                    file,
+                    indent=1,
+                )
@@ -0,0 +1,72 @@
+import numpy as np
+
+
+class RealTimeCurve:
+    """
+    Keeps one persistent curve on a plot widget and redraws it from a
+    fixed-size window buffer, so a frame only costs the visible samples.
+    Multi-channel signals show their selected channel.
+    """
+
+    def __init__(self, plot_widget, window=300, pen="orange"):
+        self.plot_widget = plot_widget
+        self.window = window
+        self.curve = plot_widget.plot(pen=pen)
+
+        # Twice the window, so the visible samples are always one contiguous slice
+        self.y_buffer = np.zeros(2 * window)
+        self.start = 0  # buffer position of the oldest visible sample
+        self.end = 0  # buffer position after the newest sample
+        self.index = 0  # signal index after the newest sample
+        self.signal_data = None
+        self.channel = 0
+
+    def update(self, signal_data, index):
+        new_samples = index - self.index
+        if signal_data is not self.signal_data or not 0 <= new_samples <= self.window:
+            # Another signal, a rewind or a big jump: fill the window again
+            self.refill(signal_data, index)
+        elif new_samples > 0:
+            self.push(self.samples(signal_data, self.index, index))
+        self.index = index
+        self.draw()
+
+    def refill(self, signal_data, index):
+        self.signal_data = signal_data
+        first = max(0, index - self.window)
+        count = index - first
+        if count > 0:
+            self.y_buffer[:count] = self.samples(signal_data, first, index)
+        self.start, self.end = 0, count
+
+    def samples(self, signal_data, start, stop):
+        samples = signal_data[start:stop]
+        if np.ndim(samples) == 2:
+            return np.asarray(samples)[:, self.channel]
+        return samples
+
+    def set_channel(self, channel):
+        self.channel = channel
+        self.signal_data = None  # fill the window again on the next update
+
+    def push(self, samples):
+        count = len(samples)
+        if self.end + count > len(self.y_buffer):
+            # Move the samples that stay visible back to the front
+            keep = self.window - count
+            self.y_buffer[:keep] = self.y_buffer[self.end - keep : self.end]
+            self.start, self.end = 0, keep
+        self.y_buffer[self.end : self.end + count] = samples
+        self.end += count
+        self.start = max(self.start, self.end - self.window)
+
+    def draw(self):
+        y_data = self.y_buffer[self.start : self.end]
+        x_data = np.arange(self.index - len(y_data), self.index)
+        self.curve.setData(x_data, y_data)
+
+    def clear(self):
+        self.signal_data = None
+        self.index = 0
+        self.start = self.end = 0
+        self.curve.setData([], [])
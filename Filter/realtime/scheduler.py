@@ -0,0 +1,37 @@
+from PyQt5.QtCore import QTimer
+
+
+class ResponseUpdateScheduler:
+    """
+    Merges bursts of update requests (e.g. while dragging a zero or a pole)
+    into at most one call of the update function per display frame.
+    """
+
+    def __init__(self, update_function, interval=16):
+        self.update_function = update_function
+        self.pending = False
+
+        # Cooldown after each update, requests inside it are merged
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.on_timeout)
+
+    def request(self):
+        if self.timer.isActive():
+            self.pending = True
+        else:
+            self.run()
+
+    def run(self):
+        self.pending = False
+        self.update_function()
+        self.timer.start()
+
+    def on_timeout(self):
+        if self.pending:
+            self.run()
+
+    def cancel(self):
+        self.pending = False
+        self.timer.stop()
@@ -0,0 +1,105 @@
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class TaskCancelled(Exception):
+    pass
+
+
+class WorkerSignals(QObject):
+    progress = pyqtSignal(int)  # percent done
+    finished = pyqtSignal(object)  # the result of the task
+    failed = pyqtSignal(str)  # the error message
+    done = pyqtSignal()  # emitted last, however the task ended
+
+
+class Worker(QRunnable):
+    """
+    Runs function(*args, progress=...) on a thread of the pool. The function
+    reports the fraction it has done through progress, which raises
+    TaskCancelled once the worker is cancelled to stop it at that point.
+    """
+
+    def __init__(self, function, *args):
+        super(Worker, self).__init__()
+        self.function = function
+        self.args = args
+        self.signals = WorkerSignals()
+        self.cancelled = False
+        self.percent = -1
+
+    def report_progress(self, fraction):
+        if self.cancelled:
+            raise TaskCancelled()
+        # Only whole percents are sent to the UI thread
+        percent = int(100 * fraction)
+        if percent != self.percent:
+            self.percent = percent
+            self.signals.progress.emit(percent)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def run(self):
+        try:
+            result = self.function(*self.args, progress=self.report_progress)
+            if not self.cancelled:
+                self.signals.finished.emit(result)
+        except TaskCancelled:
+            pass
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        finally:
+            self.signals.done.emit()
+
+
+class TaskRunner(QObject):
+    """
+    Runs tasks off the UI thread, one per name: starting a task cancels the
+    one running under the same name. The callbacks are called on the UI
+    thread, and never for a cancelled task.
+    """
+
+    progress = pyqtSignal(int)
+    busy = pyqtSignal(bool)
+
+    def __init__(self, pool=None):
+        super(TaskRunner, self).__init__()
+        # Not the global pool: Qt converts images on it, and a pixmap loaded on
+        # the UI thread would wait for it behind a task waiting for the GIL
+        self.pool = pool or QThreadPool()
+        self.workers = {}
+
+    def start(self, name, function, *args, on_finished=None, on_failed=None):
+        self.cancel(name)
+        worker = Worker(function, *args)
+        self.workers[name] = worker
+
+        worker.signals.progress.connect(self.progress)
+        if on_finished is not None:
+            # A task cancelled after finishing may still have its result queued
+            worker.signals.finished.connect(
+                lambda result: None if worker.cancelled else on_finished(result)
+            )
+        if on_failed is not None:
+            worker.signals.failed.connect(on_failed)
+        worker.signals.done.connect(lambda: self.on_done(name, worker))
+
+        self.progress.emit(0)
+        self.busy.emit(True)
+        self.pool.start(worker)
+        return worker
+
+    def on_done(self, name, worker):
+        if self.workers.get(name) is worker:
+            del self.workers[name]
+            self.busy.emit(bool(self.workers))
+
+    def cancel(self, name):
+        worker = self.workers.pop(name, None)
+        if worker is not None:
+            worker.cancel()
+            self.busy.emit(bool(self.workers))
+
+    def cancel_all(self):
+        for name in list(self.workers):
+            self.cancel(name)
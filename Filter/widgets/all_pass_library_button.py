@@ -1,15 +1,20 @@
 import os
 
-import matplotlib.pyplot as plt
 import numpy as np
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QPixmap
+from PyQt5.QtCore import QPointF, Qt
+from PyQt5.QtGui import QColor, QPainter, QPen, QPixmap, QPolygonF
 from PyQt5.QtWidgets import QLabel, QPushButton, QVBoxLayout
-from scipy.signal import freqz, zpk2tf
+from core.all_pass import all_pass_phase, all_pass_roots
+from core.response import frequency_grid
 
+# On-disk cache of the phase response thumbnails, keyed on the 'a' coefficient
 save_directory = "Resources/All-Pass-Phase-Responses"
 os.makedirs(save_directory, exist_ok=True)
 
+THUMBNAIL_SIZE = (75, 56)
+THUMBNAIL_POINTS = 200  # more points than the thumbnail has pixels across
+CASCADE_POINTS = 8000  # the grid shared by the cascaded phase responses
+
 
 class AllPassProcessButton(QPushButton):
     def __init__(self, allPassValue, index, parent=None):
@@ -19,28 +24,23 @@ class AllPassProcessButton(QPushButton):
         self.index = index
 
         # get the data you need
-        (
-            self.zero,
-            self.pole,
-            self.numerator,
-            self.denominator,
-        ) = self.Calculate_zero_and_pole()
+        self.zero, self.pole = self.Calculate_zero_and_pole()
         image_path = self.plot_response()
 
         # for appearance
         self.image_path = image_path
         self.name = f"a = {self.allPassValue}"
 
-        # for calculating
-        self.all_pass_frequencies_values = None
-        self.all_pass_response_complex = None
+        # for calculating: computed once, in a batch for the whole library or
+        # when first cascaded
+        self.phase_response = None
 
         layout = QVBoxLayout(self)
         layout.setAlignment(Qt.AlignCenter)
 
         icon_label = QLabel()
         icon_label.setAlignment(Qt.AlignCenter)
-        icon_label.setPixmap(QPixmap(image_path).scaled(75, 75, Qt.KeepAspectRatio))
+        icon_label.setPixmap(self.thumbnail)
         layout.addWidget(icon_label)
 
         text_label = QLabel(self.name)
@@ -52,34 +52,54 @@ class AllPassProcessButton(QPushButton):
 
     def Calculate_zero_and_pole(self):
         a_complex = complex(self.allPassValue)
-        zeros = []
-        poles = []
-        pole = a_complex
-        zero = (1 / np.abs(a_complex)) * np.exp(1j * np.angle(a_complex))
-        poles.append(pole)
-        zeros.append(zero)
-
-        numerator, denominator = zpk2tf(zeros, poles, 1)
-        self.all_pass_frequencies_values, self.all_pass_response_complex = freqz(
-            numerator, denominator, worN=8000
-        )
+        zero, pole = all_pass_roots(a_complex)
 
-        return zero, pole, numerator, denominator
+        return complex(zero), complex(pole)
 
     def plot_response(self):
-        plt.figure()
-        plt.plot(
-            self.all_pass_frequencies_values,
-            np.unwrap(np.angle(self.all_pass_response_complex)),
-            color="orange",
-            linewidth=5,
+        # Thumbnails rendered in a previous run are reused as they are
+        a_complex = complex(self.allPassValue)
+        save_path = os.path.join(
+            save_directory,
+            f"phase_response_{a_complex.real:.12g}_{a_complex.imag:.12g}.png",
         )
-        plt.axis("off")
-        # Save the plot as a PNG file
-        save_path = os.path.join(save_directory, f"phase_response_{self.index}.png")
-        plt.savefig(save_path, transparent=True)
-        plt.clf()
+        if os.path.exists(save_path):
+            self.thumbnail = QPixmap(save_path)
+            return save_path
+
+        phase = all_pass_phase(a_complex, frequency_grid(THUMBNAIL_POINTS))[0]
+        self.thumbnail = self.draw_phase_curve(phase)
+        self.thumbnail.save(save_path, "PNG")
         return save_path
 
-    def get_transfer_function(self):
-        return self.numerator, self.denominator
+    def draw_phase_curve(self, phase):
+        """
+        Draw the phase curve straight into a transparent pixmap.
+        """
+        width, height = THUMBNAIL_SIZE
+        margin = 3  # room for the pen width
+
+        # Scale the curve to the pixmap, flat curves are drawn in the middle
+        span = np.ptp(phase)
+        x = np.linspace(margin, width - margin, len(phase))
+        if span == 0:
+            y = np.full(len(phase), height / 2)
+        else:
+            y = margin + (phase.max() - phase) / span * (height - 2 * margin)
+
+        pixmap = QPixmap(width, height)
+        pixmap.fill(Qt.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(QPen(QColor("orange"), 2))
+        painter.drawPolyline(QPolygonF([QPointF(*point) for point in zip(x, y)]))
+        painter.end()
+        return pixmap
+
+    def get_phase_response(self):
+        # Unwrapped phase on the grid shared by the cascade
+        if self.phase_response is None:
+            self.phase_response = all_pass_phase(
+                complex(self.allPassValue), frequency_grid(CASCADE_POINTS)
+            )[0]
+        return self.phase_response
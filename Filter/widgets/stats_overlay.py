@@ -0,0 +1,56 @@
+from PyQt5.QtCore import Qt, QTimer
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import QLabel
+
+
+class StatsOverlay(QLabel):
+    """
+    Live timings of the hot paths, drawn over the signal plots and refreshed
+    twice a second while shown.
+    """
+
+    def __init__(self, instrumentation, parent=None):
+        super(StatsOverlay, self).__init__(parent)
+        self.instrumentation = instrumentation
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setFont(QFont("Monospace", 8))
+        self.setStyleSheet(
+            "background-color: rgba(0, 0, 0, 170); color: white; padding: 6px;"
+        )
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.hide()
+
+    def set_shown(self, shown):
+        if shown:
+            self.refresh()
+            self.move(10, 30)
+            self.raise_()
+            self.show()
+            self.refresh_timer.start(500)
+        else:
+            self.refresh_timer.stop()
+            self.hide()
+
+    def refresh(self):
+        summary = self.instrumentation.summary()
+        lines = [f"{'':<16}{'mean':>8}{'p95':>8}{'max':>8}  ms"]
+        for name, timer in summary["timers"].items():
+            lines.append(
+                f"{name:<16}{timer['mean_ms']:8.2f}{timer['p95_ms']:8.2f}"
+                f"{timer['max_ms']:8.2f}"
+            )
+        lines.append("")
+        lines.append(
+            f"frames {summary['frames']}, missed deadlines "
+            f"{summary['missed_deadlines']}"
+        )
+        lines.append(f"samples/s {summary['samples_per_second']:.0f}")
+        lines.append("frame durations:")
+        peak = max(summary["frame_histogram"].values(), default=0) or 1
+        for label, count in summary["frame_histogram"].items():
+            bar = "#" * round(20 * count / peak)
+            lines.append(f"  {label:<12}{count:5d} {bar}")
+        self.setText("\n".join(lines))
+        self.adjustSize()
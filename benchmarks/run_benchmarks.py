@@ -0,0 +1,358 @@
+"""
+Benchmarks of the signal processing hot paths, run headless.
+
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --quick --only filter import
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/<old>.json
+
+Each run is saved as JSON under benchmarks/results/, named after the commit
+it measured, so the timings of two commits can be compared with --compare.
+The Qt benchmarks use the offscreen platform, no display is needed.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Filter"))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from core import FilterDesign, all_pass_phase, open_signal, write_signal
+
+RESULTS_DIRECTORY = os.path.join(ROOT, "benchmarks", "results")
+
+# Sizes of the full run, and of a --quick run
+SIZES = {
+    "full": {
+        "filter_orders": (2, 8, 32),
+        "filter_lengths": (10_000, 100_000, 1_000_000),
+        "root_counts": (10, 100, 1000),
+        "cascade_lengths": (1, 10, 100, 1000),
+        "import_lengths": (100_000, 1_000_000),
+        "frame_lengths": (100_000, 1_000_000),
+        "frames": 200,
+    },
+    "quick": {
+        "filter_orders": (2, 8),
+        "filter_lengths": (10_000, 100_000),
+        "root_counts": (10, 100),
+        "cascade_lengths": (1, 10, 100),
+        "import_lengths": (100_000,),
+        "frame_lengths": (100_000,),
+        "frames": 50,
+    },
+}
+
+# The application, created on first use by the benchmarks that need Qt
+application = None
+
+
+def measure(function, repeat=5):
+    """
+    Call function repeat times and return its best and median durations,
+    in seconds.
+    """
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return {"best": min(durations), "median": statistics.median(durations)}
+
+
+def random_roots(count, radius, rng, conjugates=True):
+    # Conjugate pairs give the design real coefficients, lone roots complex ones
+    if not conjugates:
+        return (
+            radius * np.sqrt(rng.random(count)) * np.exp(2j * np.pi * rng.random(count))
+        )
+    pairs = (
+        radius
+        * np.sqrt(rng.random(count // 2))
+        * np.exp(1j * np.pi * rng.random(count // 2))
+    )
+    return np.concatenate([pairs, np.conj(pairs)])
+
+
+def start_application():
+    global application
+    if application is None:
+        # The all-pass library saves its thumbnails relative to the repository
+        os.chdir(ROOT)
+        from filterDesignBackend import Backend
+        from filterDesignUI import Ui_FilterDesigner
+        from PyQt5 import QtWidgets
+
+        app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+        window = QtWidgets.QMainWindow()
+        ui = Ui_FilterDesigner()
+        ui.setupUi(window)
+        backend = Backend(ui)
+        window.show()
+        app.processEvents()
+        application = app, window, ui, backend
+    return application
+
+
+def benchmark_filter(sizes, rng):
+    # The work of the "filter" task started by apply_filter
+    from filterDesignBackend import signal_task
+
+    results = []
+    # Real sections for conjugate designs, complex sections for the others
+    for sections, conjugates in (("real", True), ("complex", False)):
+        for order in sizes["filter_orders"]:
+            design = FilterDesign(
+                random_roots(order, 0.95, rng, conjugates),
+                random_roots(order, 0.9, rng, conjugates),
+            )
+            for length in sizes["filter_lengths"]:
+                data = rng.standard_normal(length)
+                timing = measure(lambda: signal_task(design.filter, data, None), 3)
+                results.append(
+                    {
+                        "sections": sections,
+                        "order": order,
+                        "samples": length,
+                        **timing,
+                        "samples_per_second": length / timing["median"],
+                    }
+                )
+    return results
+
+
+def benchmark_responses(sizes, rng):
+    from PyQt5.QtCore import QPointF
+
+    app, _, ui, backend = start_application()
+    ui.addConjugatesCheckBox.setChecked(False)
+    results = []
+    for count in sizes["root_counts"]:
+        zeros, poles = random_roots(count, 1.2, rng), random_roots(count, 0.9, rng)
+        backend.import_filter(
+            [QPointF(root.real, root.imag) for root in zeros],
+            [QPointF(root.real, root.imag) for root in poles],
+            [],
+            [],
+        )
+        timing = measure(backend.update_responses, 10)
+        results.append({"roots": 2 * len(zeros), **timing})
+    backend.reset_design()
+    return results
+
+
+def benchmark_cascade(sizes, rng):
+    app, _, ui, backend = start_application()
+    button = backend.all_pass_filters[0]
+    frequencies = backend.phase_cascade.frequencies
+
+    def toggle():
+        button.setChecked(True)
+        button.setChecked(False)
+
+    results = []
+    for length in sizes["cascade_lengths"]:
+        # Members other than the toggled button are added to the cascade
+        # directly, so no thumbnails are rendered for them
+        members = [("benchmark", index) for index in range(length - 1)]
+        coefficients = 0.9 * np.exp(2j * np.pi * rng.random(len(members)))
+        for member, phase in zip(members, all_pass_phase(coefficients, frequencies)):
+            backend.phase_cascade.add(member, phase)
+
+        # One update adds or removes the button, a toggle does both
+        timing = measure(toggle, 10)
+        results.append(
+            {
+                "cascade_length": length,
+                "best": timing["best"] / 2,
+                "median": timing["median"] / 2,
+            }
+        )
+        for member in members:
+            backend.phase_cascade.remove(member)
+    return results
+
+
+def benchmark_import(sizes, rng):
+    # The work of the "import" task started by import_signal
+    from filterDesignBackend import signal_task
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for length in sizes["import_lengths"]:
+            data = np.cumsum(rng.standard_normal(length))
+            record = os.path.join(directory, f"signal_{length}")
+            # A WFDB record is its header and its .dat file
+            for extension, files in ((".csv", (".csv",)), (".hea", (".hea", ".dat"))):
+                path = record + extension
+                write_signal(path, data)
+                size = sum(os.path.getsize(record + name) for name in files)
+                timing = measure(lambda: signal_task(open_signal, path, None), 3)
+                results.append(
+                    {
+                        "format": extension[1:],
+                        "samples": length,
+                        "bytes": size,
+                        **timing,
+                        "samples_per_second": length / timing["median"],
+                    }
+                )
+    return results
+
+
+def benchmark_frames(sizes, rng):
+    from core import SignalStats
+
+    app, _, ui, backend = start_application()
+    results = []
+    for length in sizes["frame_lengths"]:
+        data = np.cumsum(rng.standard_normal(length))
+        backend.on_signal_imported((data, SignalStats(data)))
+        backend.plotting_timer.stop()
+
+        # Each frame advances the plots and lets Qt repaint them
+        durations = []
+        for _ in range(sizes["frames"]):
+            start = time.perf_counter()
+            backend.update_real_time_plots()
+            app.processEvents()
+            durations.append(time.perf_counter() - start)
+        durations = np.array(durations)
+        results.append(
+            {
+                "samples": length,
+                "frames": len(durations),
+                "best": float(durations.min()),
+                "median": float(np.median(durations)),
+                "p95": float(np.percentile(durations, 95)),
+                "frame_budget": backend.update_interval / 1000,
+            }
+        )
+    return results
+
+
+BENCHMARKS = {
+    "filter": benchmark_filter,
+    "responses": benchmark_responses,
+    "cascade": benchmark_cascade,
+    "import": benchmark_import,
+    "frames": benchmark_frames,
+}
+
+
+def git_revision():
+    def git(*args):
+        return subprocess.run(
+            ["git", *args], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+    try:
+        return git("rev-parse", "HEAD"), bool(git("status", "--porcelain", "Filter"))
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def environment():
+    commit, dirty = git_revision()
+    return {
+        "commit": commit,
+        "dirty": dirty,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def parameters(result):
+    # What a result was measured for, as opposed to what was measured
+    measured = {"best", "median", "p95", "samples_per_second", "bytes"}
+    return tuple((key, value) for key, value in result.items() if key not in measured)
+
+
+def describe(items):
+    return ", ".join(
+        f"{key}={value:.4g}" if isinstance(value, float) else f"{key}={value}"
+        for key, value in items
+    )
+
+
+def compare(old, new):
+    """
+    Print the ratio of the new median durations to the old ones, for the
+    results measured with the same parameters in both runs.
+    """
+    print(f"{old['environment']['commit']} -> {new['environment']['commit']}")
+    for name, results in new["results"].items():
+        previous = {
+            parameters(result): result for result in old["results"].get(name, [])
+        }
+        for result in results:
+            match = previous.get(parameters(result))
+            if match is None:
+                continue
+            ratio = result["median"] / match["median"]
+            label = describe(parameters(result))
+            print(f"  {name:<10} {label:<40} {ratio:6.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the signal processing hot paths."
+    )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=BENCHMARKS,
+        default=list(BENCHMARKS),
+        help="the benchmarks to run (all by default)",
+    )
+    parser.add_argument("--quick", action="store_true", help="run with smaller sizes")
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="the JSON file to write (benchmarks/results/<commit>.json by default)",
+    )
+    parser.add_argument(
+        "--compare", help="a previous JSON result to compare this run with"
+    )
+    args = parser.parse_args(argv)
+
+    sizes = SIZES["quick" if args.quick else "full"]
+    rng = np.random.default_rng(0)
+    report = {"environment": environment(), "quick": args.quick, "results": {}}
+    for name in args.only:
+        start = time.perf_counter()
+        report["results"][name] = BENCHMARKS[name](sizes, rng)
+        print(f"{name}: done in {time.perf_counter() - start:.1f} s")
+        for result in report["results"][name]:
+            print("  " + describe(result.items()))
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIRECTORY, exist_ok=True)
+        output = os.path.join(
+            RESULTS_DIRECTORY, f"{report['environment']['commit'] or 'results'}.json"
+        )
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results saved to {output}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            compare(json.load(file), report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())